@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Form
+from typing import Optional
+import logging
+
+from app.core.audit.audit_utils import audit_writer
+from app.core.database.engine import get_pool_stats
+from app.core.database.mysql_utils import get_schema_cache_stats, refresh_table_schema
+from app.utils.file_utils import get_config_cache_stats
+
+router = APIRouter()
+
+@router.get("/debug/caches")
+def get_cache_stats():
+    """
+    Hit/miss counters of the in-process caches: reflected table schemas (mysql_utils)
+    and the parsed config_db.json / sot_config.json snapshots.
+    """
+    return {
+        "schema": get_schema_cache_stats(),
+        "config": get_config_cache_stats()
+    }
+
+@router.post("/debug/schema/refresh")
+def refresh_schema_cache(table_name: Optional[str] = Form(None)):
+    """
+    Re-reflect one table, or every cached table when table_name is empty.
+    Needed only after schema changes made outside the app (e.g. a manual ALTER TABLE).
+    """
+    refreshed = refresh_table_schema(table_name)
+    logging.info(f"🔄 Refreshed schema cache for {refreshed}")
+    return {"refreshed": refreshed, "stats": get_schema_cache_stats()}
+
+@router.get("/debug/pool")
+def get_connection_pool_stats():
+    """
+    Shared database connection pool: occupancy (checked_out, overflow, idle) and checkout,
+    wait and timeout counters since startup. A growing waits/timeouts count means
+    DB_POOL_SIZE + DB_MAX_OVERFLOW is too small for the concurrent request load.
+    """
+    return get_pool_stats()
+
+@router.get("/debug/audit-writer")
+def get_audit_writer_stats():
+    """
+    Background audit writer: events queued/written, events spooled to disk while MySQL
+    was unavailable (replayed later) and the current queue depth.
+    """
+    return audit_writer.get_stats()
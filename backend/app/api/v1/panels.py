@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Request
+from fastapi.responses import StreamingResponse
 from typing import List
 import pandas as pd
 import logging
@@ -6,17 +7,17 @@ import csv
 import io
 
 from app.models.panel import PanelConfig, PanelName, PanelUpdate, PanelCreate
-from app.utils.file_utils import load_db, save_db
+from app.utils.file_utils import load_db, save_db, list_panels, get_panel_config
 from app.api.deps import get_current_user
-from app.core.database.mysql_utils import create_panel_table, get_panel_headers_from_db, fetch_all_rows
+from app.core.database.mysql_utils import create_panel_table, get_panel_headers_from_db, iter_rows, ensure_mapping_indexes, remove_panel_from_user_index, clear_panel_status, drop_panel_swap_tables
 from app.core.audit.audit_utils import log_audit_event
+from app.utils.json_stream import iter_json_rows
 
 router = APIRouter()
 
 @router.get("/panels", response_model=List[PanelConfig])
 def get_panels():
-    db = load_db()
-    return db["panels"]
+    return list_panels()
 
 @router.post("/panels/add")
 def add_panel(panel: PanelConfig, request: Request):
@@ -53,6 +54,11 @@ def modify_panel(update: PanelUpdate, request: Request):
             if update.panel_headers is not None:
                 panel["panel_headers"] = update.panel_headers
             save_db(db)
+            if update.key_mapping is not None:
+                # Index the new join keys on the panel and SOT tables
+                index_success, index_error = ensure_mapping_indexes(update.name, update.key_mapping)
+                if not index_success:
+                    logging.warning(f"Failed to index key columns for panel '{update.name}': {index_error}")
             # Audit log
             try:
                 log_audit_event(
@@ -77,6 +83,14 @@ def delete_panel(panel: PanelName, request: Request):
     deleted_panel = next((p for p in db["panels"] if p["name"] == panel.name), None)
     db["panels"] = [p for p in db["panels"] if p["name"] != panel.name]
     save_db(db)
+    try:
+        remove_panel_from_user_index(panel.name)
+    except Exception as e:
+        logging.error(f"Failed to remove panel '{panel.name}' from user index: {e}")
+    # A panel re-added under the same name starts without statuses
+    clear_panel_status(panel.name)
+    # Drop the tables a swap upload keeps next to the panel table
+    drop_panel_swap_tables(panel.name)
     # Audit log
     try:
         log_audit_event(
@@ -170,6 +184,11 @@ def save_panel(panel: PanelCreate, request: Request):
             logging.error(f"Failed to log audit event: {audit_error}")
         raise HTTPException(status_code=500, detail=f"MySQL table creation failed: {error}")
     
+    # Index the join keys on the SOT tables this panel is reconciled against
+    index_success, index_error = ensure_mapping_indexes(panel.name, panel.key_mapping)
+    if not index_success:
+        logging.warning(f"Failed to index key columns for panel '{panel.name}': {index_error}")
+    
     # Log audit event for successful panel save
     try:
         log_audit_event(
@@ -202,8 +221,7 @@ def get_panel_details(panel_name: str):
     """
     try:
         # Load panel configuration to verify panel exists
-        db = load_db()
-        panel = next((p for p in db["panels"] if p["name"] == panel_name), None)
+        panel = get_panel_config(panel_name)
         if not panel:
             raise HTTPException(status_code=404, detail="Panel not found")
         
@@ -212,21 +230,11 @@ def get_panel_details(panel_name: str):
         if not headers:
             raise HTTPException(status_code=404, detail="Panel table not found in database")
         
-        # Fetch all panel data
-        try:
-            panel_rows = fetch_all_rows(panel_name)
-            if not panel_rows:
-                panel_rows = []
-        except Exception as e:
-            logging.error(f"Error fetching panel data: {e}")
-            raise HTTPException(status_code=500, detail=f"Error fetching panel data: {str(e)}")
-        
-        logging.info(f"Fetched {len(panel_rows)} rows for panel '{panel_name}'")
-        
-        return {
-            "panel_name": panel_name,
-            "rows": panel_rows
-        }
+        # Stream panel data batch by batch
+        return StreamingResponse(
+            iter_json_rows({"panel_name": panel_name}, iter_rows(panel_name), label=panel_name),
+            media_type="application/json"
+        )
         
     except HTTPException:
         raise
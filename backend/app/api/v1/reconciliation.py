@@ -6,40 +6,56 @@ import pandas as pd
 import csv
 import io
 import logging
-import time
+from itertools import chain
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
 from app.api.deps import get_current_user
 from app.utils.timestamp import get_ist_timestamp
-from app.utils.file_utils import load_db, update_upload_history_status
-from app.utils.validators import generate_file_hash, check_duplicate_file, validate_file_structure
-from app.config.settings import RECON_HISTORY_PATH, RECON_SUMMARY_PATH
-from app.core.database.mysql_utils import insert_panel_data_rows, fetch_all_rows, update_initial_status_bulk
+from app.utils.file_utils import get_panel_config, panel_key_field
+from app.utils.validators import check_duplicate_file, validate_file_structure
+from app.config.settings import RECON_ENGINE, PANEL_UPLOAD_MODE
+from app.core.database.mysql_utils import insert_panel_data_rows, check_panel_delta, apply_panel_delta, swap_panel_table, fetch_rows, iter_rows, get_panel_headers_from_db, update_initial_status_bulk, count_panel_status_categories, get_status_counts, table_has_rows, reconcile_hr_status_pushdown
 from app.core.audit.audit_utils import log_audit_event
+from app.core.database.metadata_store import save_upload_record, update_upload_history_status, list_upload_records, append_recon_summary, list_recon_summaries, get_recon_summary
+from app.core.reconciliation.user_index import refresh_user_index
 from app.utils.file_server_manager import file_server_manager
+from app.utils.upload_stream import spool_upload, remove_spool_file, detect_csv_encoding, iter_csv_rows, iter_dataframe_rows, RowCounter
+from app.core.jobs.job_manager import upload_job_manager, JobQueueFullError
 
 router = APIRouter()
 
 @router.post("/recon/upload")
-def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile = File(...)):
+def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile = File(...), mode: Optional[str] = Form(None)):
     """
     3-Stage Panel File Upload Process using only doc_id:
     - doc_id: Single identifier for entire process and file naming
+    - The stages run on the background upload job pool; poll /uploads/jobs/{doc_id} for progress
+    
+    mode: "replace" backs up, clears and reloads the whole panel table; "delta" diffs the file
+    against the table on the panel key column and only inserts/updates/deletes (and archives)
+    the rows that changed; "swap" loads a shadow table and swaps it in with one RENAME TABLE, so
+    readers never see the table empty. Defaults to PANEL_UPLOAD_MODE; delta falls back to replace
+    when the file columns differ from the table.
     """
+    upload_mode = (mode or PANEL_UPLOAD_MODE).strip().lower()
+    if upload_mode not in ["replace", "delta", "swap"]:
+        raise HTTPException(status_code=400, detail=f"Unknown upload mode '{upload_mode}'. Use 'replace', 'delta' or 'swap'.")
+    
     # Generate single doc_id for entire process
     doc_id = str(uuid.uuid4())  # ✅ This is used for everything
     doc_name = file.filename
     uploaded_by = get_current_user(request)
     timestamp = get_ist_timestamp()
     filename = file.filename.lower()
-    contents = file.file.read()
     
-    # Generate file hash for duplicate detection
-    file_hash = generate_file_hash(contents)
+    # Spool the upload to disk chunk by chunk, hashing it for duplicate detection on the way
+    spool_path, file_hash, file_size = spool_upload(file.file)
     
     # Check for duplicate file
     is_duplicate, duplicate_info = check_duplicate_file(file_hash, doc_name, "panel")
     if is_duplicate:
+        remove_spool_file(spool_path)
         # Log audit event for duplicate file upload attempt
         try:
             log_audit_event(
@@ -80,25 +96,69 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
         "file_hash": file_hash
     }
     
+    try:
+        save_upload_record("panel", upload_record)
+    except Exception as e:
+        logging.error(f"Failed to write upload history: {e}")
+    
+    # Hand the 3-stage pipeline over to the background job pool
+    try:
+        job = upload_job_manager.submit(doc_id, "panel_upload", panel_name, process_panel_upload, upload_record, spool_path, filename, upload_mode)
+    except (JobQueueFullError, RuntimeError) as e:
+        logging.error(f"❌ Could not queue panel upload job (doc_id: {doc_id}): {e}")
+        remove_spool_file(spool_path)
+        upload_record["status"] = "failed"
+        upload_record["error"] = str(e)
+        try:
+            save_upload_record("panel", upload_record)
+        except Exception as history_error:
+            logging.error(f"Failed to write upload history: {history_error}")
+        return {
+            "error": str(e),
+            "panelname": panel_name,
+            "docid": doc_id,
+            "docname": doc_name,
+            "timestamp": timestamp,
+            "total_records": 0,
+            "uploadedby": uploaded_by,
+            "status": "failed"
+        }
+    
+    return {
+        "panelname": panel_name,
+        "docid": doc_id,  # ✅ Single doc_id, also the job id
+        "docname": doc_name,
+        "timestamp": timestamp,
+        "total_records": 0,
+        "uploadedby": uploaded_by,
+        "status": upload_record["status"],
+        "job_status": job["status"],
+        "error": None
+    }
+
+def process_panel_upload(upload_record, spool_path, filename, upload_mode="replace"):
+    """
+    Run the 3 upload stages for a spooled panel file. Executed on the upload job pool.
+    upload_mode: "replace" (backup-clear-reload), "delta" (see apply_panel_delta) or "swap" (see swap_panel_table).
+    The file is streamed to the file server and parsed/inserted in batches, never read into memory whole.
+    Returns the final upload result (same shape as the synchronous /recon/upload response).
+    """
+    panel_name = upload_record["panelname"]
+    doc_id = upload_record["docid"]
+    doc_name = upload_record["docname"]
+    timestamp = upload_record["timestamp"]
+    uploaded_by = upload_record["uploadedby"]
+    
     # Helper function to update history
     def update_history(status, error_message=None, total_records=0):
         upload_record["status"] = status
         upload_record["total_records"] = total_records
         if error_message:
             upload_record["error"] = error_message
+        upload_job_manager.update_stage(doc_id, status)
         
         try:
-            if not os.path.exists(RECON_HISTORY_PATH):
-                with open(RECON_HISTORY_PATH, "w") as f:
-                    json.dump([], f)
-            
-            with open(RECON_HISTORY_PATH, "r+") as f:
-                history = json.load(f)
-                # Remove existing entry with same docid if exists
-                history = [item for item in history if item.get("docid") != doc_id]
-                history.append(upload_record)
-                f.seek(0)
-                json.dump(history, f, indent=2)
+            save_upload_record("panel", upload_record)
         except Exception as e:
             logging.error(f"Failed to write upload history: {e}")
     
@@ -119,8 +179,8 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
                 "status": "failed"
             }
         
-        file_info = file_server_manager.save_uploaded_file(
-            contents, 
+        file_info = file_server_manager.save_uploaded_file_from_path(
+            spool_path, 
             doc_name, 
             upload_type="panels", 
             entity_name=panel_name,
@@ -131,10 +191,6 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
         # Update status to reflect Stage 1 completion
         update_history("uploaded")
         
-        # 🕐 DELAY: Wait 3 seconds to show "uploaded" status
-        logging.info(f"⏳ Stage 1 completed - waiting 3 seconds to show 'uploaded' status for doc_id: {doc_id}")
-        time.sleep(3)
-        
     except Exception as e:
         logging.error(f"❌ Stage 1: Failed to save uploaded file: {str(e)}")
         update_history("failed", f"Failed to save uploaded file: {str(e)}")
@@ -148,6 +204,9 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
             "uploadedby": uploaded_by,
             "status": "failed"
         }
+    finally:
+        # The file server copy is the source of truth from here on
+        remove_spool_file(spool_path)
     
     # Stage 2: Move to processing
     if not file_server_manager.start_processing(doc_id, doc_name, "panels", panel_name):
@@ -169,54 +228,36 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
     update_history("processing")
     logging.info(f"🔄 Stage 2: Panel file '{doc_name}' moved to processing stage (doc_id: {doc_id})")
     
-    # 🕐 DELAY: Wait 4 seconds to show "processing" status
-    logging.info(f"⏳ Stage 2 completed - waiting 4 seconds to show 'processing' status for doc_id: {doc_id}")
-    time.sleep(4)
-    
     # Initialize variables
     error_message = None
     total_records = 0
     
     try:
-        # Get file content from processing stage
-        file_content = file_server_manager.get_file_content(doc_id, doc_name, "panels", panel_name, "processing")
-        if not file_content:
-            raise Exception("Failed to read file from processing stage")
-        
-        # Read and parse file (existing logic)
-        if filename.endswith(".xlsx") or filename.endswith(".xls") or filename.endswith(".xlsb"):
-            df = pd.read_excel(io.BytesIO(file_content))
-            # Clean NaN values - replace with None for database compatibility
-            df = df.replace({pd.NA: None, pd.NaT: None})
-            df = df.where(pd.notnull(df), None)
-            rows = df.to_dict(orient="records")
-            total_records = len(df)
-        else:
-            # Try different encodings for CSV files
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            lines = None
+        # Stream the file from the processing stage
+        with file_server_manager.local_copy(doc_id, doc_name, "panels", panel_name, "processing") as file_path:
+            # Read and parse file
+            if filename.endswith(".xlsx") or filename.endswith(".xls") or filename.endswith(".xlsb"):
+                df = pd.read_excel(file_path)
+                # Clean NaN values - replace with None for database compatibility
+                df = df.replace({pd.NA: None, pd.NaT: None})
+                df = df.where(pd.notnull(df), None)
+                row_source = iter_dataframe_rows(df)
+            else:
+                # Try different encodings for CSV files
+                encoding = detect_csv_encoding(file_path)
+                if encoding is None:
+                    raise HTTPException(status_code=400, detail="Unable to decode file. Please ensure it's a valid CSV or Excel file.")
+                row_source = iter_csv_rows(file_path, encoding)
             
-            for encoding in encodings:
-                try:
-                    lines = file_content.decode(encoding).splitlines()
-                    break
-                except UnicodeDecodeError:
-                    continue
+            rows = RowCounter(row_source)
+            first_row = next(rows, None)
             
-            if lines is None:
-                raise HTTPException(status_code=400, detail="Unable to decode file. Please ensure it's a valid CSV or Excel file.")
+            # Check if we have data to process
+            if first_row is None:
+                raise Exception("No data found in uploaded file")
             
-            reader = csv.DictReader(lines)
-            rows = [dict((k.strip().lower(), v.strip() if v is not None else "") for k, v in row.items()) for row in reader]
-            total_records = max(len(lines) - 1, 0)  # Exclude header
-        
-        # Check if we have data to process
-        if not rows or len(rows) == 0:
-            raise Exception("No data found in uploaded file")
-        
-        # Validate panel file structure against existing table (if table exists)
-        if rows:
-            file_headers = list(rows[0].keys())
+            # Validate panel file structure against existing table (if table exists)
+            file_headers = list(first_row.keys())
             is_valid, validation_error = validate_file_structure(panel_name, file_headers)
             if not is_valid:
                 # Log audit event for file structure validation failure
@@ -256,12 +297,34 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
                     )
                 except Exception as audit_error:
                     logging.error(f"Failed to log audit event: {audit_error}")
-        
-        # Insert data (existing logic)
-        from app.core.database.mysql_utils import insert_panel_data_rows_with_backup
-        success, error_message, backup_count = insert_panel_data_rows_with_backup(panel_name, rows, doc_id, timestamp)
+            
+            if upload_mode == "delta":
+                key_field = panel_key_field(get_panel_config(panel_name) or {})
+                can_delta, delta_reason = check_panel_delta(panel_name, key_field, file_headers)
+                if not can_delta:
+                    logging.warning(f"⚠️ Delta upload not possible for '{panel_name}' ({delta_reason}), replacing the table")
+                    upload_mode = "replace"
+            
+            if upload_mode == "delta":
+                # Apply only the differences to the current table
+                success, error_message, delta_summary = apply_panel_delta(panel_name, chain([first_row], rows), key_field, doc_id, timestamp)
+                backup_count = delta_summary["archived"] if delta_summary else 0
+                if delta_summary:
+                    upload_record["delta"] = delta_summary
+            elif upload_mode == "swap":
+                # Load a shadow table and swap it in atomically
+                success, error_message, backup_count = swap_panel_table(panel_name, chain([first_row], rows), doc_id, timestamp)
+            else:
+                # Insert data in batches while the file is streamed
+                from app.core.database.mysql_utils import insert_panel_data_rows_with_backup
+                success, error_message, backup_count = insert_panel_data_rows_with_backup(panel_name, chain([first_row], rows), doc_id, timestamp)
+            upload_record["upload_mode"] = upload_mode
+            total_records = rows.count
         
         if success:
+            # Re-index the panel's users (new rows, statuses reset by the upload)
+            refresh_user_index(panel_name)
+            
             # Stage 3: Move to processed
             if file_server_manager.complete_processing(doc_id, doc_name, "panels", panel_name):
                 update_history("processed", total_records=total_records)
@@ -279,6 +342,8 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
                         details={
                             "panel_name": panel_name,
                             "backup_count": backup_count,
+                            "upload_mode": upload_mode,
+                            "delta": upload_record.get("delta"),
                             "doc_id": doc_id,
                             "backup_timestamp": timestamp
                         },
@@ -343,27 +408,28 @@ def upload_recon(request: Request, panel_name: str = File(...), file: UploadFile
         "total_records": total_records,
         "uploadedby": uploaded_by,
         "status": upload_record["status"],
+        "upload_mode": upload_mode,
+        "delta": upload_record.get("delta"),
         "error": error_message if error_message else None
     }
 
 @router.get("/panels/upload_history")
 def get_panel_upload_history():
-    if not os.path.exists(RECON_HISTORY_PATH):
-        return []
-    with open(RECON_HISTORY_PATH, "r") as f:
-        return json.load(f)
+    return list_upload_records("panel")
 
 @router.post("/recon/process")
-def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
+def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...), engine: Optional[str] = Form(None)):
     """
     Reconcile internal users and not found users from panel with HR data.
     Processes records where initial_status indicates internal users or not found users.
-    Updates initial_status column with HR status (active/inactive/not found).
+    Updates initial_status (in panel_status) with HR status (active/inactive/not found).
+    
+    engine: "python" matches rows in Python, "sql" pushes the join, counts and update down to MySQL.
+    Defaults to RECON_ENGINE; both produce the same summary.
     """
     try:
         # Load config and get key mapping for HR data
-        db = load_db()
-        panel = next((p for p in db["panels"] if p["name"] == panel_name), None)
+        panel = get_panel_config(panel_name)
         if not panel:
             raise HTTPException(status_code=404, detail="Panel not found")
         
@@ -373,50 +439,73 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
         
         panel_key, hr_key = list(key_mapping.items())[0]
         
-        # Fetch panel data
-        panel_rows = fetch_all_rows(panel_name)
-        if not panel_rows:
-            raise HTTPException(status_code=404, detail="No panel data found")
-        
-        # Categorize users based on initial_status
-        users_to_reconcile = []  # Internal users + not found users
-        other_users = []
-        service_users_count = 0
-        thirdparty_users_count = 0
-        not_found_count = 0
-        internal_users_count = 0
-        
-        for row in panel_rows:
-            initial_status_raw = row.get("initial_status", "")
-            initial_status = initial_status_raw.strip().lower() if initial_status_raw is not None else ""
-            
-            # Check if this user should be reconciled (internal users or not found users)
-            if initial_status in ["employee", "internal", "internal_user", "internal users"]:
-                users_to_reconcile.append(row)
-                internal_users_count += 1
-            elif initial_status in ["not found", "not_found"]:
-                users_to_reconcile.append(row)
-                not_found_count += 1
-            else:
-                other_users.append(row)
-                # Count by category for summary
-                if initial_status in ["service", "service_user", "service users"]:
-                    service_users_count += 1
-                elif initial_status in ["thirdparty", "thirdparty_user", "thirdparty users", "third_party", "third_party_user", "third_party users"]:
-                    thirdparty_users_count += 1
+        recon_engine = (engine or RECON_ENGINE).strip().lower()
+        if recon_engine not in ["python", "sql"]:
+            raise HTTPException(status_code=400, detail=f"Unknown reconciliation engine '{recon_engine}'. Use 'python' or 'sql'.")
+        logging.info(f"Reconciling panel '{panel_name}' with HR data using the {recon_engine} engine")
         
-        logging.info(f"Found {len(users_to_reconcile)} users to reconcile ({internal_users_count} internal + {not_found_count} not found) and {len(other_users)} other users out of {len(panel_rows)} total panel users")
+        if recon_engine == "sql":
+            # Count initial_status groups in MySQL instead of fetching the panel
+            counts = count_panel_status_categories(panel_name)
+            if not counts["total"]:
+                raise HTTPException(status_code=404, detail="No panel data found")
+            
+            total_panel_users = counts["total"]
+            internal_users_count = counts["internal"]
+            not_found_count = counts["not_found"]
+            service_users_count = counts["service"]
+            thirdparty_users_count = counts["thirdparty"]
+            users_to_reconcile_count = internal_users_count + not_found_count
+            other_users_count = total_panel_users - users_to_reconcile_count
+            
+            logging.info(f"Found {users_to_reconcile_count} users to reconcile ({internal_users_count} internal + {not_found_count} not found) and {other_users_count} other users out of {total_panel_users} total panel users")
+        else:
+            # Stream panel data (match key and initial_status only); only the rows to reconcile are kept
+            users_to_reconcile = []  # Internal users + not found users
+            total_panel_users = 0
+            other_users_count = 0
+            service_users_count = 0
+            thirdparty_users_count = 0
+            not_found_count = 0
+            internal_users_count = 0
+            
+            for row in chain.from_iterable(iter_rows(panel_name, [panel_key, "initial_status"])):
+                total_panel_users += 1
+                initial_status_raw = row.get("initial_status", "")
+                initial_status = initial_status_raw.strip().lower() if initial_status_raw is not None else ""
+                
+                # Check if this user should be reconciled (internal users or not found users)
+                if initial_status in ["employee", "internal", "internal_user", "internal users"]:
+                    users_to_reconcile.append(row)
+                    internal_users_count += 1
+                elif initial_status in ["not found", "not_found"]:
+                    users_to_reconcile.append(row)
+                    not_found_count += 1
+                else:
+                    other_users_count += 1
+                    # Count by category for summary
+                    if initial_status in ["service", "service_user", "service users"]:
+                        service_users_count += 1
+                    elif initial_status in ["thirdparty", "thirdparty_user", "thirdparty users", "third_party", "third_party_user", "third_party users"]:
+                        thirdparty_users_count += 1
+            
+            if not total_panel_users:
+                raise HTTPException(status_code=404, detail="No panel data found")
+            
+            logging.info(f"Found {len(users_to_reconcile)} users to reconcile ({internal_users_count} internal + {not_found_count} not found) and {other_users_count} other users out of {total_panel_users} total panel users")
+            
+            users_to_reconcile_count = len(users_to_reconcile)
         
-        if not users_to_reconcile:
+        if not users_to_reconcile_count:
             return {
                 "recon_id": None,
                 "summary": {
                     "panel_name": panel_name,
-                    "total_panel_users": len(panel_rows),
+                    "total_panel_users": total_panel_users,
                     "internal_users": 0,
                     "not_found_users": 0,
                     "users_to_reconcile": 0,
-                    "other_users": len(other_users),
+                    "other_users": other_users_count,
                     "service_users": service_users_count,
                     "thirdparty_users": thirdparty_users_count,
                     "matched": 0,
@@ -428,26 +517,13 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
                 "message": "No internal users or not found users to reconcile"
             }
         
-        # Fetch HR data
-        hr_rows = fetch_all_rows("hr_data")
-        if not hr_rows:
-            raise HTTPException(status_code=404, detail="HR data not found")
-        
-        # Create HR lookup
-        hr_lookup = {}
-        for row in hr_rows:
-            hr_value = row.get(hr_key, "")
-            if hr_value is not None:
-                hr_lookup[str(hr_value).strip().lower()] = row
-        
-        details = []
         summary = {
             "panel_name": panel_name,
-            "total_panel_users": len(panel_rows),
+            "total_panel_users": total_panel_users,
             "internal_users": internal_users_count,
             "not_found_users": not_found_count,
-            "users_to_reconcile": len(users_to_reconcile),
-            "other_users": len(other_users),
+            "users_to_reconcile": users_to_reconcile_count,
+            "other_users": other_users_count,
             "service_users": service_users_count,
             "thirdparty_users": thirdparty_users_count,
             "matched": 0,
@@ -455,60 +531,78 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
             "found_inactive": 0,
             "not_found": 0
         }
+        # Generated up front so the written statuses record the reconciliation that set them
+        recon_id = f"RCN_{uuid.uuid4().hex[:8]}"
         
-        updates = []
-        
-        # Process each user to reconcile (internal users + not found users)
-        for user_row in users_to_reconcile:
-            panel_val_raw = user_row.get(panel_key, "")
-            panel_val = str(panel_val_raw).strip().lower() if panel_val_raw is not None else ""
-            hr_row = hr_lookup.get(panel_val)
+        if recon_engine == "sql":
+            if not table_has_rows("hr_data"):
+                raise HTTPException(status_code=404, detail="HR data not found")
             
-            user_status = "not found"
-            employment_status = None
+            # LEFT JOIN + GROUP BY + UPDATE ... JOIN inside MySQL
+            try:
+                pushdown_result = reconcile_hr_status_pushdown(panel_name, panel_key, hr_key, recon_id=recon_id)
+            except Exception as e:
+                raise HTTPException(status_code=500, detail=f"Failed to update panel data: {str(e)}")
+            for field in ["matched", "found_active", "found_inactive", "not_found"]:
+                summary[field] = pushdown_result[field]
+        else:
+            # Create HR lookup, streaming HR data (match key and employment status only)
+            hr_lookup = {}
+            hr_row_count = 0
+            for hr_batch in iter_rows("hr_data", [hr_key, "Employment Status", "employment_status"]):
+                hr_row_count += len(hr_batch)
+                for row in hr_batch:
+                    hr_value = row.get(hr_key, "")
+                    if hr_value is not None:
+                        hr_lookup[str(hr_value).strip().lower()] = row
+            if not hr_row_count:
+                raise HTTPException(status_code=404, detail="HR data not found")
+            
+            updates = []
             
-            if hr_row:
-                # Found in HR data
-                employment_status = hr_row.get("Employment Status") or hr_row.get("employment_status")
+            # Process each user to reconcile (internal users + not found users)
+            for user_row in users_to_reconcile:
+                panel_val_raw = user_row.get(panel_key, "")
+                panel_val = str(panel_val_raw).strip().lower() if panel_val_raw is not None else ""
+                hr_row = hr_lookup.get(panel_val)
+                
+                user_status = "not found"
+                employment_status = None
                 
-                if employment_status:
-                    if employment_status.lower() in ["active", "resigned"]:
-                        user_status = "active"
-                        summary["found_active"] += 1
-                    elif employment_status.lower() == "inactive":
-                        user_status = "inactive"
-                        summary["found_inactive"] += 1
+                if hr_row:
+                    # Found in HR data
+                    employment_status = hr_row.get("Employment Status") or hr_row.get("employment_status")
+                    
+                    if employment_status:
+                        if employment_status.lower() in ["active", "resigned"]:
+                            user_status = "active"
+                            summary["found_active"] += 1
+                        elif employment_status.lower() == "inactive":
+                            user_status = "inactive"
+                            summary["found_inactive"] += 1
+                        else:
+                            user_status = f"found ({employment_status.lower()})"
                     else:
-                        user_status = f"found ({employment_status.lower()})"
+                        user_status = "found (unknown status)"
+                    
+                    summary["matched"] += 1
                 else:
-                    user_status = "found (unknown status)"
+                    summary["not_found"] += 1
                 
-                summary["matched"] += 1
-            else:
-                summary["not_found"] += 1
+                # Prepare update record
+                updates.append({
+                    panel_key: panel_val,
+                    "initial_status": user_status
+                })
             
-            # Prepare update record
-            updates.append({
-                panel_key: panel_val,
-                "initial_status": user_status
-            })
+            # Update panel table with new statuses
+            success, error_msg = update_initial_status_bulk(panel_name, updates, match_field=panel_key, recon_id=recon_id)
             
-            details.append({
-                "panel_user": user_row,
-                "hr_user": hr_row,
-                "user_status": user_status,
-                "employment_status": employment_status
-            })
-        
-        # Update panel table with new statuses
-        success, error_msg = update_initial_status_bulk(panel_name, updates, match_field=panel_key)
-        
-        if not success:
-            raise HTTPException(status_code=500, detail=f"Failed to update panel data: {error_msg}")
+            if not success:
+                raise HTTPException(status_code=500, detail=f"Failed to update panel data: {error_msg}")
         
         # Create reconciliation record
         now = datetime.now(timezone(timedelta(hours=5, minutes=30)))  # IST timezone
-        recon_id = f"RCN_{uuid.uuid4().hex[:8]}"
         recon_month = now.strftime("%b'%y")
         start_date = now.strftime("%Y-%m-%d")
         performed_by = get_current_user(request)
@@ -539,16 +633,9 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
             "summary": summary
         }
         
-        # Store in reconciliation_summary.json
+        # Store in the reconciliation summary store
         try:
-            if not os.path.exists(RECON_SUMMARY_PATH):
-                with open(RECON_SUMMARY_PATH, "w") as f:
-                    json.dump([], f)
-            with open(RECON_SUMMARY_PATH, "r+") as f:
-                data = json.load(f)
-                data.append(recon_record)
-                f.seek(0)
-                json.dump(data, f, indent=2)
+            append_recon_summary(recon_record)
         except Exception as e:
             logging.error(f"Failed to write reconciliation summary: {e}")
             # Update status if we can't save the record
@@ -563,6 +650,9 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
         if status == "complete":
             update_upload_history_status(panel_name, "complete")
         
+        # Re-index the panel's users with the reconciled statuses
+        refresh_user_index(panel_name, recon_id)
+        
         # Log audit event
         try:
             log_audit_event(
@@ -571,7 +661,8 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
                 details={
                     "panel_name": panel_name,
                     "recon_id": recon_id,
-                    "users_to_reconcile": len(users_to_reconcile),
+                    "users_to_reconcile": users_to_reconcile_count,
+                    "recon_engine": recon_engine,
                     "matched": summary["matched"],
                     "found_active": summary["found_active"],
                     "found_inactive": summary["found_inactive"],
@@ -588,7 +679,7 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
             "recon_id": recon_id,
             "summary": summary,
             "details": [],
-            "message": f"Reconciled {len(users_to_reconcile)} users ({internal_users_count} internal + {not_found_count} not found) with HR data. Status: {status}"
+            "message": f"Reconciled {users_to_reconcile_count} users ({internal_users_count} internal + {not_found_count} not found) with HR data. Status: {status}"
         }
         
     except HTTPException:
@@ -627,14 +718,7 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
             }
             
             # Store failed record
-            if not os.path.exists(RECON_SUMMARY_PATH):
-                with open(RECON_SUMMARY_PATH, "w") as f:
-                    json.dump([], f)
-            with open(RECON_SUMMARY_PATH, "r+") as f:
-                data = json.load(f)
-                data.append(failed_record)
-                f.seek(0)
-                json.dump(data, f, indent=2)
+            append_recon_summary(failed_record)
         except Exception as e:
             logging.error(f"Failed to write failed reconciliation record: {e}")
         
@@ -680,14 +764,7 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
             }
             
             # Store failed record
-            if not os.path.exists(RECON_SUMMARY_PATH):
-                with open(RECON_SUMMARY_PATH, "w") as f:
-                    json.dump([], f)
-            with open(RECON_SUMMARY_PATH, "r+") as f:
-                data = json.load(f)
-                data.append(failed_record)
-                f.seek(0)
-                json.dump(data, f, indent=2)
+            append_recon_summary(failed_record)
         except Exception as save_error:
             logging.error(f"Failed to write failed reconciliation record: {save_error}")
         
@@ -697,23 +774,15 @@ def reconcile_panel_with_sot(request: Request, panel_name: str = Form(...)):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/recon/summary")
-def get_recon_summaries():
-    if not os.path.exists(RECON_SUMMARY_PATH):
-        return []
-    with open(RECON_SUMMARY_PATH, "r") as f:
-        data = json.load(f)
-    return data
+def get_recon_summaries(panel_name: Optional[str] = None):
+    return list_recon_summaries(panel_name)
 
 @router.get("/recon/summary/{recon_id}")
 def get_recon_summary_detail(recon_id: str = Path(...)):
-    if not os.path.exists(RECON_SUMMARY_PATH):
-        raise HTTPException(status_code=404, detail="No reconciliation summaries found")
-    with open(RECON_SUMMARY_PATH, "r") as f:
-        data = json.load(f)
-    for rec in data:
-        if rec.get("recon_id") == recon_id:
-            return rec
-    raise HTTPException(status_code=404, detail="Reconciliation summary not found")
+    rec = get_recon_summary(recon_id)
+    if rec is None:
+        raise HTTPException(status_code=404, detail="Reconciliation summary not found")
+    return rec
 
 @router.get("/recon/initialsummary")
 def get_initial_summary(status_type: str = "initial"):
@@ -723,15 +792,19 @@ def get_initial_summary(status_type: str = "initial"):
     """
     try:
         # Load reconciliation summaries
-        if not os.path.exists(RECON_SUMMARY_PATH):
+        recon_summaries = list_recon_summaries()
+        if not recon_summaries:
             return {"summaries": [], "columns": []}
         
-        with open(RECON_SUMMARY_PATH, "r") as f:
-            recon_summaries = json.load(f)
-        
         initial_summaries = []
         all_status_values = set()  # Collect all unique status values across all panels
         
+        # Determine which status field to use
+        status_field = "final_status" if status_type == "final" else "initial_status"
+        
+        # GROUP BY counts once per distinct panel (cached per panel data version)
+        panel_status_counts = {}
+        
         for recon in recon_summaries:
             try:
                 panel_name = recon.get("panelname")
@@ -739,25 +812,15 @@ def get_initial_summary(status_type: str = "initial"):
                     logging.warning(f"Reconciliation {recon.get('recon_id')} missing panel name")
                     continue
                 
-                # Fetch panel data to get status counts
-                panel_rows = fetch_all_rows(panel_name)
-                if not panel_rows:
+                if panel_name not in panel_status_counts:
+                    panel_status_counts[panel_name] = get_status_counts(panel_name, status_field)
+                status_counts = dict(panel_status_counts[panel_name])
+                if not status_counts:
                     logging.warning(f"No data found for panel: {panel_name}")
                     continue
                 
-                # Determine which status field to use
-                status_field = "final_status" if status_type == "final" else "initial_status"
-                
-                # Count distinct status values
-                status_counts = {}
-                total_users = len(panel_rows)
-                
-                for row in panel_rows:
-                    status = row.get(status_field, "Unknown")
-                    if status is None:
-                        status = "Unknown"
-                    status_counts[status] = status_counts.get(status, 0) + 1
-                    all_status_values.add(status)  # Add to global set
+                total_users = sum(status_counts.values())
+                all_status_values.update(status_counts.keys())  # Add to global set
                 
                 # Create summary entry
                 summary_entry = {
@@ -810,20 +873,8 @@ def get_initial_summary_detail(recon_id: str = Path(...), status_type: str = "in
     status_type: "initial" for initial_status, "final" for final_status
     """
     try:
-        # Load reconciliation summaries
-        if not os.path.exists(RECON_SUMMARY_PATH):
-            raise HTTPException(status_code=404, detail="No reconciliation summaries found")
-        
-        with open(RECON_SUMMARY_PATH, "r") as f:
-            recon_summaries = json.load(f)
-        
         # Find the specific reconciliation
-        recon = None
-        for r in recon_summaries:
-            if r.get("recon_id") == recon_id:
-                recon = r
-                break
-        
+        recon = get_recon_summary(recon_id)
         if not recon:
             raise HTTPException(status_code=404, detail="Reconciliation summary not found")
         
@@ -831,34 +882,23 @@ def get_initial_summary_detail(recon_id: str = Path(...), status_type: str = "in
         if not panel_name:
             raise HTTPException(status_code=400, detail="Panel name not found in reconciliation")
         
-        # Fetch panel data to get status counts
-        panel_rows = fetch_all_rows(panel_name)
-        if not panel_rows:
-            raise HTTPException(status_code=404, detail=f"No data found for panel: {panel_name}")
-        
         # Determine which status field to use
         status_field = "final_status" if status_type == "final" else "initial_status"
         
-        # Filter panel data based on status_type
+        # Select panel columns based on status_type
+        columns = get_panel_headers_from_db(panel_name)
         if status_type == "initial":
             # For initial summary, exclude final_status column
-            filtered_panel_rows = []
-            for row in panel_rows:
-                filtered_row = {k: v for k, v in row.items() if k != "final_status"}
-                filtered_panel_rows.append(filtered_row)
-        else:
-            # For final summary, include all columns
-            filtered_panel_rows = panel_rows
+            columns = [col for col in columns if col != "final_status"]
         
-        # Count distinct status values
-        status_counts = {}
-        total_users = len(filtered_panel_rows)
+        # Fetch panel data to get status counts
+        filtered_panel_rows = fetch_rows(panel_name, columns)
+        if not filtered_panel_rows:
+            raise HTTPException(status_code=404, detail=f"No data found for panel: {panel_name}")
         
-        for row in filtered_panel_rows:
-            status = row.get(status_field, "Unknown")
-            if status is None:
-                status = "Unknown"
-            status_counts[status] = status_counts.get(status, 0) + 1
+        # Count distinct status values (cached per panel data version)
+        status_counts = get_status_counts(panel_name, status_field)
+        total_users = len(filtered_panel_rows)
         
         # Create detailed summary
         summary_detail = {
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi.responses import StreamingResponse
 import uuid
 import json
 import os
@@ -6,17 +7,20 @@ import pandas as pd
 import csv
 import io
 import logging
-import time
+from itertools import chain
 
 from app.api.deps import get_current_user
 from app.utils.timestamp import get_ist_timestamp
-from app.utils.validators import validate_file_structure, generate_file_hash, check_duplicate_file
-from app.utils.file_utils import load_db, load_sot_config, add_sot_to_config, update_sot_headers, get_sot_config, get_all_sot_configs, delete_sot_config
-from app.config.settings import SOT_UPLOADS_PATH
-from app.core.database.mysql_utils import insert_sot_data_rows, get_panel_headers_from_db, fetch_all_rows
+from app.utils.validators import validate_file_structure, check_duplicate_file
+from app.utils.file_utils import list_panels, add_sot_to_config, update_sot_headers, get_sot_config, get_all_sot_configs, delete_sot_config
+from app.core.database.mysql_utils import insert_sot_data_rows, get_panel_headers_from_db, fetch_rows, count_rows, iter_rows
 from app.core.audit.audit_utils import log_audit_event
+from app.core.database.metadata_store import save_upload_record, list_upload_records
 from app.models.sot import SOTCreate, SOTUpdate
 from app.utils.file_server_manager import file_server_manager
+from app.utils.json_stream import iter_json_rows
+from app.utils.upload_stream import spool_upload, remove_spool_file, detect_csv_encoding, iter_csv_rows, iter_dataframe_rows, RowCounter
+from app.core.jobs.job_manager import upload_job_manager, JobQueueFullError
 
 router = APIRouter()
 
@@ -25,6 +29,7 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
     """
     3-Stage SOT File Upload Process using only doc_id:
     - doc_id: Single identifier for entire process and file naming
+    - The stages run on the background upload job pool; poll /uploads/jobs/{doc_id} for progress
     """
     # Generate single doc_id for entire process
     doc_id = str(uuid.uuid4())  # ✅ This is used for everything
@@ -32,14 +37,14 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
     uploaded_by = get_current_user(request)
     timestamp = get_ist_timestamp()
     filename = file.filename.lower()
-    contents = file.file.read()
     
-    # Generate file hash for duplicate detection
-    file_hash = generate_file_hash(contents)
+    # Spool the upload to disk chunk by chunk, hashing it for duplicate detection on the way
+    spool_path, file_hash, file_size = spool_upload(file.file)
     
     # Check for duplicate file
     is_duplicate, duplicate_info = check_duplicate_file(file_hash, doc_name, "sot")
     if is_duplicate:
+        remove_spool_file(spool_path)
         # Log audit event for duplicate file upload attempt
         try:
             log_audit_event(
@@ -79,25 +84,67 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
         "total_records": 0
     }
     
+    try:
+        save_upload_record("sot", upload_metadata)
+    except Exception as e:
+        logging.error(f"Failed to write upload history: {e}")
+    
+    # Hand the 3-stage pipeline over to the background job pool
+    try:
+        job = upload_job_manager.submit(doc_id, "sot_upload", sot_type, process_sot_upload, upload_metadata, spool_path, filename)
+    except (JobQueueFullError, RuntimeError) as e:
+        logging.error(f"❌ Could not queue SOT upload job (doc_id: {doc_id}): {e}")
+        remove_spool_file(spool_path)
+        upload_metadata["status"] = "failed"
+        upload_metadata["error"] = str(e)
+        try:
+            save_upload_record("sot", upload_metadata)
+        except Exception as history_error:
+            logging.error(f"Failed to write upload history: {history_error}")
+        return {
+            "error": str(e),
+            "doc_id": doc_id,
+            "doc_name": doc_name,
+            "uploaded_by": uploaded_by,
+            "timestamp": timestamp,
+            "status": "failed",
+            "sot_type": sot_type
+        }
+    
+    return {
+        "doc_id": doc_id,  # ✅ Single doc_id, also the job id
+        "doc_name": doc_name,
+        "uploaded_by": uploaded_by,
+        "timestamp": timestamp,
+        "status": upload_metadata["status"],
+        "sot_type": sot_type,
+        "total_records": 0,
+        "job_status": job["status"],
+        "error": None
+    }
+
+def process_sot_upload(upload_metadata, spool_path, filename):
+    """
+    Run the 3 upload stages for a spooled SOT file. Executed on the upload job pool.
+    The file is streamed to the file server and parsed/inserted in batches, never read into memory whole.
+    Returns the final upload result (same shape as the synchronous /sot/upload response).
+    """
+    doc_id = upload_metadata["doc_id"]
+    doc_name = upload_metadata["doc_name"]
+    uploaded_by = upload_metadata["uploaded_by"]
+    timestamp = upload_metadata["timestamp"]
+    sot_type = upload_metadata["sot_type"]
+    
     # Helper function to update history
     def update_history(status, error_message=None, total_records=0):
         upload_metadata["status"] = status
         upload_metadata["total_records"] = total_records
         if error_message:
             upload_metadata["error"] = error_message
+        upload_job_manager.update_stage(doc_id, status)
         
         try:
-            if not os.path.exists(SOT_UPLOADS_PATH):
-                with open(SOT_UPLOADS_PATH, "w") as f:
-                    json.dump([], f)
-            
-            with open(SOT_UPLOADS_PATH, "r+") as f:
-                history = json.load(f)
-                # Remove existing entry with same doc_id if exists
-                history = [item for item in history if item.get("doc_id") != doc_id]
-                history.append(upload_metadata)
-                f.seek(0)
-                json.dump(history, f, indent=2)
+            save_upload_record("sot", upload_metadata)
         except Exception as e:
             logging.error(f"Failed to write upload history: {e}")
     
@@ -117,8 +164,8 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
                 "sot_type": sot_type
             }
         
-        file_info = file_server_manager.save_uploaded_file(
-            contents, 
+        file_info = file_server_manager.save_uploaded_file_from_path(
+            spool_path, 
             doc_name, 
             upload_type="sot", 
             entity_name=sot_type,
@@ -129,10 +176,6 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
         # Update status to reflect Stage 1 completion
         update_history("uploaded")
         
-        # 🕐 DELAY: Wait 3 seconds to show "uploaded" status
-        logging.info(f"⏳ Stage 1 completed - waiting 3 seconds to show 'uploaded' status for doc_id: {doc_id}")
-        time.sleep(3)
-        
     except Exception as e:
         logging.error(f"❌ Stage 1: Failed to save uploaded file: {str(e)}")
         update_history("failed", f"Failed to save uploaded file: {str(e)}")
@@ -145,6 +188,9 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
             "status": "failed",
             "sot_type": sot_type
         }
+    finally:
+        # The file server copy is the source of truth from here on
+        remove_spool_file(spool_path)
     
     # Stage 2: Move to processing
     if not file_server_manager.start_processing(doc_id, doc_name, "sot", sot_type):
@@ -165,67 +211,48 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
     update_history("processing")
     logging.info(f"🔄 Stage 2: SOT file '{doc_name}' moved to processing stage (doc_id: {doc_id})")
     
-    # 🕐 DELAY: Wait 4 seconds to show "processing" status
-    logging.info(f"⏳ Stage 2 completed - waiting 4 seconds to show 'processing' status for doc_id: {doc_id}")
-    time.sleep(4)
-    
     # Initialize variables
     error_message = None
     total_records = 0
     
     try:
-        # Get file content from processing stage
-        file_content = file_server_manager.get_file_content(doc_id, doc_name, "sot", sot_type, "processing")
-        if not file_content:
-            raise Exception("Failed to read file from processing stage")
-        
-        # Read and parse file (existing logic)
-        if filename.endswith(".xlsx") or filename.endswith(".xls") or filename.endswith(".xlsb"):
-            try:
-                df = pd.read_excel(io.BytesIO(file_content))
-            except ImportError as e:
-                if "pyxlsb" in str(e) and filename.endswith(".xlsb"):
-                    raise HTTPException(
-                        status_code=400, 
-                        detail="Missing optional dependency 'pyxlsb' for .xlsb files. Please install it using: pip install pyxlsb"
-                    )
-                else:
-                    raise e
-            # Convert headers to lowercase
-            df.columns = [col.strip().lower() for col in df.columns]
-            # Clean NaN values - replace with None for database compatibility
-            df = df.replace({pd.NA: None, pd.NaT: None})
-            df = df.where(pd.notnull(df), None)
-            rows = df.to_dict(orient="records")
-            total_records = len(df)
-        else:
-            # Try different encodings for CSV files
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-            lines = None
-            
-            for encoding in encodings:
+        # Stream the file from the processing stage
+        with file_server_manager.local_copy(doc_id, doc_name, "sot", sot_type, "processing") as file_path:
+            # Read and parse file
+            if filename.endswith(".xlsx") or filename.endswith(".xls") or filename.endswith(".xlsb"):
                 try:
-                    lines = file_content.decode(encoding).splitlines()
-                    break
-                except UnicodeDecodeError:
-                    continue
+                    df = pd.read_excel(file_path)
+                except ImportError as e:
+                    if "pyxlsb" in str(e) and filename.endswith(".xlsb"):
+                        raise HTTPException(
+                            status_code=400, 
+                            detail="Missing optional dependency 'pyxlsb' for .xlsb files. Please install it using: pip install pyxlsb"
+                        )
+                    else:
+                        raise e
+                # Convert headers to lowercase
+                df.columns = [col.strip().lower() for col in df.columns]
+                # Clean NaN values - replace with None for database compatibility
+                df = df.replace({pd.NA: None, pd.NaT: None})
+                df = df.where(pd.notnull(df), None)
+                row_source = iter_dataframe_rows(df)
+            else:
+                # Try different encodings for CSV files
+                encoding = detect_csv_encoding(file_path)
+                if encoding is None:
+                    raise HTTPException(status_code=400, detail="Unable to decode file. Please ensure it's a valid CSV or Excel file.")
+                # Headers are lowercased and values cleaned row by row
+                row_source = iter_csv_rows(file_path, encoding)
             
-            if lines is None:
-                raise HTTPException(status_code=400, detail="Unable to decode file. Please ensure it's a valid CSV or Excel file.")
+            rows = RowCounter(row_source)
+            first_row = next(rows, None)
             
-            reader = csv.DictReader(lines)
-            # Convert headers to lowercase and clean data
-            reader.fieldnames = [h.strip().lower() for h in reader.fieldnames]
-            rows = [dict((k.strip().lower(), v.strip() if v is not None else "") for k, v in row.items()) for row in reader]
-            total_records = max(len(lines) - 1, 0)  # Exclude header
-        
-        # Check if we have data to process
-        if not rows or len(rows) == 0:
-            raise Exception("No data found in uploaded file")
-        
-        # Validate file structure against existing table (if table exists)
-        if rows:
-            file_headers = list(rows[0].keys())
+            # Check if we have data to process
+            if first_row is None:
+                raise Exception("No data found in uploaded file")
+            
+            # Validate file structure against existing table (if table exists)
+            file_headers = list(first_row.keys())
             is_valid, validation_error = validate_file_structure(sot_type, file_headers)
             if not is_valid:
                 # Log audit event for file structure validation failure
@@ -266,9 +293,10 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
                 except Exception as audit_error:
                     logging.error(f"Failed to log audit event: {audit_error}")
         
-        # Insert data (existing logic)
-        from app.core.database.mysql_utils import insert_sot_data_rows_with_backup
-        success, error_message, backup_count = insert_sot_data_rows_with_backup(sot_type, rows, doc_id, timestamp)
+            # Insert data in batches while the file is streamed
+            from app.core.database.mysql_utils import insert_sot_data_rows_with_backup
+            success, error_message, backup_count = insert_sot_data_rows_with_backup(sot_type, chain([first_row], rows), doc_id, timestamp)
+            total_records = rows.count
         
         if success:
             # Stage 3: Move to processed
@@ -357,11 +385,8 @@ def upload_sot(request: Request, file: UploadFile = File(...), sot_type: str = F
 
 @router.get("/sot/uploads")
 def list_sot_uploads():
-    if not os.path.exists(SOT_UPLOADS_PATH):
-        return []
     try:
-        with open(SOT_UPLOADS_PATH, "r") as f:
-            return json.load(f)
+        return list_upload_records("sot")
     except Exception as e:
         logging.error(f"Error reading SOT uploads: {e}")
         return []
@@ -373,9 +398,8 @@ def list_sots_from_config():
     configured_sots = [sot["name"] for sot in sot_config["sots"]]
     
     # Also get SOTs from panel configurations for backward compatibility
-    db = load_db()
     panel_sots = set()
-    for panel in db.get("panels", []):
+    for panel in list_panels():
         key_mapping = panel.get("key_mapping", {})
         panel_sots.update(key_mapping.keys())
     
@@ -497,9 +521,9 @@ def debug_sot_table(sot_name: str):
     Debug endpoint to inspect SOT table data and structure.
     """
     try:
-        rows = fetch_all_rows(sot_name)
+        row_count = count_rows(sot_name)
         
-        if not rows:
+        if not row_count:
             return {
                 "sot_name": sot_name,
                 "row_count": 0,
@@ -507,16 +531,13 @@ def debug_sot_table(sot_name: str):
                 "sample_data": []
             }
         
-        # Get column names from first row
-        columns = list(rows[0].keys()) if rows else []
-        
-        # Get sample data (first 5 rows)
-        sample_data = rows[:5]
+        # Get sample data (first 5 rows) instead of loading the whole table
+        sample_data = fetch_rows(sot_name, limit=5)
         
         return {
             "sot_name": sot_name,
-            "row_count": len(rows),
-            "columns": columns,
+            "row_count": row_count,
+            "columns": get_panel_headers_from_db(sot_name),
             "sample_data": sample_data
         }
     except Exception as e:
@@ -530,21 +551,11 @@ def get_sot_details(sot_name: str):
     Returns the SOT rows data in the same format as panel details.
     """
     try:
-        # Fetch all SOT data
-        try:
-            sot_rows = fetch_all_rows(sot_name)
-            if not sot_rows:
-                sot_rows = []
-        except Exception as e:
-            logging.error(f"Error fetching SOT data: {e}")
-            raise HTTPException(status_code=500, detail=f"Error fetching SOT data: {str(e)}")
-        
-        logging.info(f"Fetched {len(sot_rows)} rows for SOT '{sot_name}'")
-        
-        return {
-            "sot_name": sot_name,
-            "rows": sot_rows
-        }
+        # Stream SOT data batch by batch (a missing table streams an empty rows list)
+        return StreamingResponse(
+            iter_json_rows({"sot_name": sot_name}, iter_rows(sot_name), label=sot_name),
+            media_type="application/json"
+        )
         
     except HTTPException:
         raise
@@ -0,0 +1,118 @@
+from fastapi import APIRouter, HTTPException, Path, Query, Request
+from typing import Optional
+import logging
+
+from app.api.deps import get_current_user
+from app.core.audit.audit_utils import log_audit_event
+from app.core.database.snapshots import get_snapshot, list_snapshots, restore_snapshot, diff_snapshots
+from app.core.jobs.job_manager import upload_job_manager
+from app.core.reconciliation.user_index import refresh_user_index
+from app.models.upload import DuplicateCheckRequest
+from app.utils.file_utils import list_panels
+from app.utils.validators import check_duplicate_files, DUPLICATE_CHECK_SOURCES
+
+router = APIRouter()
+
+@router.get("/uploads/jobs")
+def list_upload_jobs(job_type: Optional[str] = None, active_only: bool = False):
+    """
+    List upload jobs known to this server, optionally only the queued/running ones.
+    job_type: "panel_upload" or "sot_upload"
+    """
+    return {
+        "jobs": upload_job_manager.list_jobs(job_type=job_type, active_only=active_only),
+        "stats": upload_job_manager.get_stats()
+    }
+
+@router.get("/uploads/jobs/{doc_id}")
+def get_upload_job(doc_id: str = Path(...)):
+    """
+    Get the status of a background upload job.
+    status: queued/running/completed/failed; stage: the upload history status;
+    result: the final upload response once the job has finished.
+    """
+    job = upload_job_manager.get(doc_id)
+    if not job:
+        logging.warning(f"Upload job not found: {doc_id}")
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    return job
+
+
+@router.post("/uploads/duplicates/check")
+def check_duplicate_uploads(check: DuplicateCheckRequest):
+    """
+    Check many SHA-256 file hashes against earlier successful uploads in one call,
+    so clients can pre-validate a folder of files before uploading them.
+    upload_type: "sot", "panel" or "recategorization"
+    """
+    if check.upload_type not in DUPLICATE_CHECK_SOURCES:
+        raise HTTPException(status_code=400, detail=f"Invalid upload_type. Use one of {list(DUPLICATE_CHECK_SOURCES)}")
+    try:
+        results = check_duplicate_files(check.file_hashes, check.upload_type)
+    except Exception as e:
+        logging.error(f"Error checking duplicate uploads: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+    return {
+        "upload_type": check.upload_type,
+        "total": len(results),
+        "duplicates": sum(1 for is_duplicate, _ in results.values() if is_duplicate),
+        "results": [
+            {"file_hash": file_hash, "is_duplicate": is_duplicate, "duplicate_info": duplicate_info}
+            for file_hash, (is_duplicate, duplicate_info) in results.items()
+        ]
+    }
+
+
+@router.get("/uploads/snapshots")
+def list_upload_snapshots(table_name: Optional[str] = None, limit: int = Query(50, ge=1, le=1000)):
+    """
+    List stored snapshots of superseded uploads (newest first), optionally for one panel/SOT table.
+    """
+    try:
+        return {"snapshots": list_snapshots(table_name, limit)}
+    except Exception as e:
+        logging.error(f"Error listing snapshots: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.get("/uploads/snapshots/{table_name}/diff")
+def diff_upload_snapshots(table_name: str, from_doc_id: str, to_doc_id: str, key_field: Optional[str] = None,
+                          sample_size: int = Query(20, ge=0, le=1000)):
+    """
+    Compare two snapshots of a table: added/removed columns, added/removed/changed/unchanged
+    row counts and sample rows. Rows are matched on key_field (the key_mapping column by default).
+    """
+    success, error, diff = diff_snapshots(table_name, from_doc_id, to_doc_id, key_field, sample_size)
+    if not success:
+        status_code = 404 if error.startswith("No snapshot") else 400
+        raise HTTPException(status_code=status_code, detail=error)
+    return diff
+
+@router.post("/uploads/snapshots/{table_name}/{doc_id}/restore")
+def restore_upload_snapshot(table_name: str, doc_id: str, request: Request):
+    """
+    Replace the table's data with a snapshot. The current data is snapshotted first,
+    so the restore can be undone by restoring that snapshot.
+    """
+    if not get_snapshot(table_name, doc_id):
+        raise HTTPException(status_code=404, detail="Snapshot not found")
+    user = get_current_user(request)
+    success, error, summary = restore_snapshot(table_name, doc_id)
+    try:
+        log_audit_event(
+            action="DATA_RESTORE",
+            user=user,
+            details={"table_name": table_name, "doc_id": doc_id, **(summary or {"error": error})},
+            status="success" if success else "failed"
+        )
+    except Exception as audit_error:
+        logging.error(f"Failed to log audit event: {audit_error}")
+    if not success:
+        raise HTTPException(status_code=500, detail=error)
+    # Re-index a restored panel's users (rows replaced, statuses reset by the restore)
+    restored_table = table_name.replace(" ", "_").lower()
+    for panel in list_panels():
+        panel_name = panel.get("name")
+        if panel_name and panel_name.replace(" ", "_").lower() == restored_table:
+            refresh_user_index(panel_name)
+            break
+    return summary
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, Query
 import uuid
 import json
 import os
@@ -7,19 +7,25 @@ import csv
 import io
 import logging
 from datetime import datetime, timezone, timedelta
+from typing import Optional
 
 from app.api.deps import get_current_user
 from app.utils.timestamp import get_ist_timestamp
-from app.utils.file_utils import load_db
+from app.utils.file_utils import get_panel_config, list_panels, extract_mapping_fields, panel_key_field
 from app.utils.validators import generate_file_hash, check_duplicate_file
-from app.config.settings import RECON_HISTORY_PATH, RECON_SUMMARY_PATH
-from app.core.database.mysql_utils import fetch_all_rows, add_column_if_not_exists, update_initial_status_bulk, update_final_status_bulk
+from app.models.user import UserLookupRequest
+from app.config.settings import RECON_HISTORY_PATH, CATEGORIZE_ENGINE, USER_SUMMARY_PAGE_SIZE, USER_SUMMARY_MAX_PAGE_SIZE
+from app.core.database.mysql_utils import fetch_rows, update_initial_status_bulk, update_final_status_bulk, lookup_user_panels
 from app.core.audit.audit_utils import log_audit_event
+from app.core.reconciliation.categorization import categorize_users_vectorized, normalize_sot_name, load_categorization_inputs
+from app.core.reconciliation.user_summary import build_user_summary_page, InvalidCursorError
+from app.core.reconciliation.user_index import refresh_user_index
+from app.core.database.metadata_store import list_recon_summaries
 
 router = APIRouter()
 
 @router.post("/categorize_users")
-def categorize_users(panel_name: str = Form(...)):
+def categorize_users(panel_name: str = Form(...), engine: Optional[str] = Form(None)):
     """
     Dynamically categorize users in a panel based on configured SOT mappings.
     This function is production-ready and handles any number of SOTs with any field mappings.
@@ -30,10 +36,12 @@ def categorize_users(panel_name: str = Form(...)):
     - thirdparty_users or third_party_users (lowest priority)
     
     Other SOTs in the key_mapping will be ignored for categorization purposes.
+    
+    engine: "python" loops over panel rows, "vectorized" resolves all rows with pandas column
+    operations. Defaults to CATEGORIZE_ENGINE; both produce the same summary and statuses.
     """
     try:
-        db = load_db()
-        panel = next((p for p in db["panels"] if p["name"] == panel_name), None)
+        panel = get_panel_config(panel_name)
         if not panel:
             raise HTTPException(status_code=404, detail="Panel not found")
         
@@ -52,13 +60,6 @@ def categorize_users(panel_name: str = Form(...)):
                 detail=f"No SOTs configured for panel '{panel_name}'. Please configure at least one SOT mapping."
             )
         
-        # Function to normalize SOT names for categorization
-        def normalize_sot_name(sot_name):
-            """Normalize SOT names to handle variations like thirdparty_users and third_party_users"""
-            if sot_name in ["thirdparty_users", "third_party_users"]:
-                return "thirdparty_users"  # Use consistent name internally
-            return sot_name
-        
         # Restrict to only the three allowed SOTs for user categorization
         allowed_sots = ["service_users", "internal_users", "thirdparty_users", "third_party_users"]
         configured_sots = [sot for sot in configured_sots if sot in allowed_sots]
@@ -74,52 +75,11 @@ def categorize_users(panel_name: str = Form(...)):
         logging.info(f"Configured SOTs for categorization: {configured_sots}")
         logging.debug(f"Key mapping configuration: {key_mapping}")
         
-        # Fetch data for all configured SOTs
-        sot_data = {}
-        for sot in configured_sots:
-            try:
-                sot_data[sot] = fetch_all_rows(sot)
-                logging.info(f"Fetched {len(sot_data[sot])} rows from SOT: {sot}")
-            except Exception as e:
-                logging.error(f"Failed to fetch data from SOT '{sot}': {e}")
-                sot_data[sot] = []
+        categorize_engine = (engine or CATEGORIZE_ENGINE).strip().lower()
+        if categorize_engine not in ["python", "vectorized"]:
+            raise HTTPException(status_code=400, detail=f"Unknown categorization engine '{categorize_engine}'. Use 'python' or 'vectorized'.")
+        logging.info(f"Categorization engine: {categorize_engine}")
         
-        # Fetch panel data
-        try:
-            panel_rows = fetch_all_rows(panel_name)
-            logging.info(f"Fetched {len(panel_rows)} rows from panel: {panel_name}")
-        except Exception as e:
-            logging.error(f"Failed to fetch panel data: {e}")
-            raise HTTPException(status_code=500, detail=f"Failed to fetch panel data: {str(e)}")
-        
-        # Initialize summary dynamically with normalized SOT names
-        summary = {}
-        for sot in configured_sots:
-            normalized_name = normalize_sot_name(sot)
-            summary[normalized_name] = 0
-        
-        summary["not_found"] = 0
-        summary["total"] = len(panel_rows)
-        summary["errors"] = 0
-        updates = []
-
-        # Helper function to extract panel_field and sot_field from mapping
-        def extract_mapping_fields(mapping):
-            """Extract panel_field and sot_field from mapping, supporting both old and new formats."""
-            if not mapping:
-                return None, None
-            
-            # Handle new format: {'panel_field': 'panel_field_value', 'sot_field': 'sot_field_value'}
-            if 'panel_field' in mapping and 'sot_field' in mapping:
-                return mapping['panel_field'], mapping['sot_field']
-            
-            # Handle old format: {'panel_field': 'sot_field'}
-            if len(mapping) == 1:
-                panel_field, sot_field = list(mapping.items())[0]
-                return panel_field, sot_field
-            
-            return None, None
-
         # Determine the match_field (key field) for the panel
         # Prioritize service_users mapping, then fall back to other SOTs
         match_field = None
@@ -143,111 +103,115 @@ def categorize_users(panel_name: str = Form(...)):
                 detail=f"No valid panel field mapping found in key_mapping for panel '{panel_name}'. Please configure the key mapping first. Available mappings: {key_mapping}"
             )
 
-        # Build lookups for each SOT using the configured SOT field
-        lookups = {}
+        # Fetch the panel and SOTs concurrently (mapped columns only) and build the SOT lookups
+        try:
+            panel_rows, lookups, timings = load_categorization_inputs(
+                panel_name, key_mapping, configured_sots, match_field, categorize_engine
+            )
+        except Exception as e:
+            logging.error(f"Failed to fetch panel data: {e}")
+            raise HTTPException(status_code=500, detail=f"Failed to fetch panel data: {str(e)}")
+        total_users = len(panel_rows)
+        
+        # Initialize summary dynamically with normalized SOT names
+        summary = {}
         for sot in configured_sots:
-            mapping = key_mapping.get(sot, {})
-            panel_field, sot_field = extract_mapping_fields(mapping)
-            logging.info(f"SOT {sot}: panel_field='{panel_field}', sot_field='{sot_field}'")
-            
-            if sot_field:
-                # Create lookup with proper error handling
-                try:
-                    lookups[sot] = {
-                        str(row.get(sot_field, "")).strip().lower(): row 
-                        for row in sot_data[sot] 
-                        if row.get(sot_field) is not None
-                    }
-                    logging.info(f"Built lookup for {sot} with {len(lookups[sot])} entries using field '{sot_field}'")
-                    logging.debug(f"Sample lookup keys for {sot}: {list(lookups[sot].keys())[:5]}")  # Show first 5 keys
-                except Exception as e:
-                    logging.error(f"Error building lookup for {sot}: {e}")
-                    lookups[sot] = {}
-            else:
-                logging.warning(f"No SOT field configured for {sot}")
-                lookups[sot] = {}
+            normalized_name = normalize_sot_name(sot)
+            summary[normalized_name] = 0
+        
+        summary["not_found"] = 0
+        summary["total"] = total_users
+        summary["errors"] = 0
+        updates = []
 
-        # Process each panel row
-        for row_idx, row in enumerate(panel_rows):
-            try:
-                status = "not found"
-                found = False
-                
-                # Check SOTs in priority order: service_users -> internal_users -> thirdparty_users/third_party_users
-                priority_sots = ["service_users", "internal_users", "thirdparty_users", "third_party_users"]
-                
-                for sot in priority_sots:
-                    if sot not in configured_sots:
-                        continue
-                        
-                    mapping = key_mapping.get(sot, {})
-                    panel_field, sot_field = extract_mapping_fields(mapping)
-                    
-                    if not panel_field or not sot_field:
-                        continue
-                    
-                    # Get panel value
-                    panel_value = row.get(panel_field, "")
-                    if not panel_value:
-                        continue
-                    
-                    panel_value = str(panel_value).strip().lower()
-                    original_panel_value = panel_value  # Keep original for logging
-                    
-                    # Apply domain matching for internal_users and thirdparty_users/third_party_users
-                    # Check if this SOT uses domain matching (either by flag or by field name)
-                    use_domain_matching = mapping.get("use_domain_matching", False)
-                    is_domain_sot = sot in ["internal_users", "thirdparty_users", "third_party_users"] and sot_field == "domain"
+        if categorize_engine == "vectorized":
+            sot_counts, not_found_count, error_count, updates = categorize_users_vectorized(
+                panel_rows, lookups, key_mapping, configured_sots, match_field
+            )
+            for normalized_name, count in sot_counts.items():
+                summary[normalized_name] += count
+            summary["not_found"] = not_found_count
+            summary["errors"] = error_count
+        else:
+            # Process each panel row
+            for row_idx, row in enumerate(panel_rows):
+                try:
+                    status = "not found"
+                    found = False
                     
-                    if (use_domain_matching or is_domain_sot) and "@" in panel_value:
-                        panel_value = panel_value.split("@")[-1].strip().lower()
-                        logging.debug(f"Row {row_idx}: Extracted domain '{panel_value}' from '{original_panel_value}' for {sot}")
+                    # Check SOTs in priority order: service_users -> internal_users -> thirdparty_users/third_party_users
+                    priority_sots = ["service_users", "internal_users", "thirdparty_users", "third_party_users"]
                     
-                    # Look for match in SOT
-                    if panel_value in lookups[sot]:
-                        sot_row = lookups[sot][panel_value]
+                    for sot in priority_sots:
+                        if sot not in configured_sots:
+                            continue
+                            
+                        mapping = key_mapping.get(sot, {})
+                        panel_field, sot_field = extract_mapping_fields(mapping)
+                        
+                        if not panel_field or not sot_field:
+                            continue
+                        
+                        # Get panel value
+                        panel_value = row.get(panel_field, "")
+                        if not panel_value:
+                            continue
                         
-                        # Try to get user type from various possible field names
-                        user_type_fields = ["user_type", "usertype", "type", "status", "category"]
-                        user_type = None
-                        for field in user_type_fields:
-                            user_type = sot_row.get(field)
-                            if user_type:
-                                break
+                        panel_value = str(panel_value).strip().lower()
+                        original_panel_value = panel_value  # Keep original for logging
                         
-                        status = user_type if user_type else "found"
-                        normalized_sot_name = normalize_sot_name(sot)
-                        summary[normalized_sot_name] += 1
-                        found = True
-                        logging.debug(f"Row {row_idx}: Found in {sot} with status '{status}' (looked for '{panel_value}')")
-                        break  # Stop checking other SOTs once a match is found
+                        # Apply domain matching for internal_users and thirdparty_users/third_party_users
+                        # Check if this SOT uses domain matching (either by flag or by field name)
+                        use_domain_matching = mapping.get("use_domain_matching", False)
+                        is_domain_sot = sot in ["internal_users", "thirdparty_users", "third_party_users"] and sot_field == "domain"
+                        
+                        if (use_domain_matching or is_domain_sot) and "@" in panel_value:
+                            panel_value = panel_value.split("@")[-1].strip().lower()
+                            logging.debug(f"Row {row_idx}: Extracted domain '{panel_value}' from '{original_panel_value}' for {sot}")
+                        
+                        # Look for match in SOT
+                        if panel_value in lookups[sot]:
+                            sot_row = lookups[sot][panel_value]
+                            
+                            # Try to get user type from various possible field names
+                            user_type_fields = ["user_type", "usertype", "type", "status", "category"]
+                            user_type = None
+                            for field in user_type_fields:
+                                user_type = sot_row.get(field)
+                                if user_type:
+                                    break
+                            
+                            status = user_type if user_type else "found"
+                            normalized_sot_name = normalize_sot_name(sot)
+                            summary[normalized_sot_name] += 1
+                            found = True
+                            logging.debug(f"Row {row_idx}: Found in {sot} with status '{status}' (looked for '{panel_value}')")
+                            break  # Stop checking other SOTs once a match is found
+                        else:
+                            logging.debug(f"Row {row_idx}: Not found in {sot} (looked for '{panel_value}')")
+                    
+                    if not found:
+                        summary["not_found"] += 1
+                        logging.debug(f"Row {row_idx}: Not found in any SOT")
+                    
+                    # Add to updates
+                    match_value = row.get(match_field, "")
+                    if match_value is not None:
+                        updates.append({
+                            match_field: str(match_value).strip().lower(), 
+                            "initial_status": status
+                        })
                     else:
-                        logging.debug(f"Row {row_idx}: Not found in {sot} (looked for '{panel_value}')")
-                
-                if not found:
-                    summary["not_found"] += 1
-                    logging.debug(f"Row {row_idx}: Not found in any SOT")
-                
-                # Add to updates
-                match_value = row.get(match_field, "")
-                if match_value is not None:
-                    updates.append({
-                        match_field: str(match_value).strip().lower(), 
-                        "initial_status": status
-                    })
-                else:
-                    logging.warning(f"Row {row_idx}: match_field '{match_field}' is None")
+                        logging.warning(f"Row {row_idx}: match_field '{match_field}' is None")
+                        summary["errors"] += 1
+                        
+                except Exception as e:
+                    logging.error(f"Error processing row {row_idx}: {e}")
                     summary["errors"] += 1
-                    
-            except Exception as e:
-                logging.error(f"Error processing row {row_idx}: {e}")
-                summary["errors"] += 1
-                continue
+                    continue
 
         # Update database
         try:
-            add_column_if_not_exists(panel_name, "initial_status", "VARCHAR(255)")
-            
             success, error_msg = update_initial_status_bulk(panel_name, updates, match_field=match_field)
             if not success:
                 raise HTTPException(status_code=500, detail=f"Database update failed: {error_msg}")
@@ -262,6 +226,9 @@ def categorize_users(panel_name: str = Form(...)):
         
         logging.info(f"User categorization completed for panel '{panel_name}'. Summary: {summary}")
         
+        # Re-index the panel's users with the new initial statuses
+        refresh_user_index(panel_name)
+        
         # Log audit event
         try:
             log_audit_event(
@@ -269,7 +236,7 @@ def categorize_users(panel_name: str = Form(...)):
                 user="system",  # This function doesn't have user context, using system
                 details={
                     "panel_name": panel_name,
-                    "total_users": len(panel_rows),
+                    "total_users": total_users,
                     "service_users": summary.get("service_users", 0),
                     "internal_users": summary.get("internal_users", 0),
                     "thirdparty_users": summary.get("thirdparty_users", 0),
@@ -286,8 +253,9 @@ def categorize_users(panel_name: str = Form(...)):
             "message": "User categorization complete", 
             "summary": summary,
             "panel_name": panel_name,
-            "total_processed": len(panel_rows),
-            "successful_updates": len(updates)
+            "total_processed": total_users,
+            "successful_updates": len(updates),
+            "timings": timings
         }
         
     except HTTPException:
@@ -341,8 +309,7 @@ def recategorize_users(request: Request, panel_name: str = Form(...), file: Uplo
     
     try:
         # Load panel configuration
-        db = load_db()
-        panel = next((p for p in db["panels"] if p["name"] == panel_name), None)
+        panel = get_panel_config(panel_name)
         if not panel:
             # Log audit event for panel not found
             try:
@@ -446,11 +413,6 @@ def recategorize_users(request: Request, panel_name: str = Form(...), file: Uplo
                 logging.error(f"Failed to log audit event: {audit_error}")
             raise HTTPException(status_code=400, detail="No data found in uploaded file")
         
-        # Get panel data
-        panel_rows = fetch_all_rows(panel_name)
-        if not panel_rows:
-            raise HTTPException(status_code=404, detail="No data found in panel table")
-        
         # Determine match field from panel configuration
         # Use the first available mapping field as the match field
         key_mapping = panel.get("key_mapping", {})
@@ -494,8 +456,15 @@ def recategorize_users(request: Request, panel_name: str = Form(...), file: Uplo
                 logging.error(f"Failed to log audit event: {audit_error}")
             raise HTTPException(status_code=400, detail="Invalid key mapping configuration")
         
-        # Extract panel field from mapping
-        panel_field = list(first_mapping.keys())[0]
+        # Extract panel field from mapping (same key column as panel_status and the user index)
+        panel_field = panel_key_field(panel)
+        if not panel_field:
+            raise HTTPException(status_code=400, detail="Invalid key mapping configuration")
+        
+        # Get panel data (only the match field and initial_status are used)
+        panel_rows = fetch_rows(panel_name, [panel_field, "initial_status"])
+        if not panel_rows:
+            raise HTTPException(status_code=404, detail="No data found in panel table")
         
         # Determine type column from uploaded file
         # Look for common type column names
@@ -609,9 +578,6 @@ def recategorize_users(request: Request, panel_name: str = Form(...), file: Uplo
                 summary["errors"] += 1
                 continue
         
-        # Add final_status column if it doesn't exist
-        add_column_if_not_exists(panel_name, "final_status", "VARCHAR(255)")
-        
         # Update database
         success, error_msg = update_final_status_bulk(panel_name, updates, match_field=panel_field)
         if not success:
@@ -636,6 +602,9 @@ def recategorize_users(request: Request, panel_name: str = Form(...), file: Uplo
         
         logging.info(f"User recategorization completed for panel '{panel_name}'. Summary: {summary}")
         
+        # Re-index the panel's users with the new final statuses
+        refresh_user_index(panel_name)
+        
         # Log audit event for successful recategorization
         try:
             log_audit_event(
@@ -696,113 +665,89 @@ def recategorize_users(request: Request, panel_name: str = Form(...), file: Uplo
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/users/summary")
-def get_user_wise_summary():
+def get_user_wise_summary(
+    limit: int = Query(USER_SUMMARY_PAGE_SIZE, ge=1, le=USER_SUMMARY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    panel_name: Optional[str] = None,
+    status: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    include_total: bool = False
+):
     """
-    Get a comprehensive user-wise summary across all panels.
-    Returns all users from all panels with their reconciliation details.
+    Get a user-wise summary across all panels, one keyset page at a time.
+    Users are ordered by email, then panel name; pass next_cursor back as cursor for the next page
+    (next_cursor is null on the last page).
+    
+    Filters: panel_name, status (final_status, or initial_status when there is no final status)
+    and email_prefix. include_total adds total_users (a COUNT per panel).
     """
     try:
-        # Load configuration and reconciliation summaries
-        db = load_db()
-        
         # Load reconciliation summaries
-        if os.path.exists(RECON_SUMMARY_PATH):
-            with open(RECON_SUMMARY_PATH, 'r') as f:
-                recon_summaries = json.load(f)
-        else:
-            recon_summaries = []
-        
-        # Create a lookup for reconciliation details by panel name
-        recon_lookup = {}
-        for recon in recon_summaries:
-            panel_name = recon.get('panelname', '')
-            if panel_name:
-                if panel_name not in recon_lookup:
-                    recon_lookup[panel_name] = []
-                recon_lookup[panel_name].append(recon)
-        
-        all_users = []
-        
-        # Process each panel
-        for panel in db.get("panels", []):
-            panel_name = panel["name"]
-            
-            try:
-                # Get panel data
-                panel_rows = fetch_all_rows(panel_name)
-                if not panel_rows:
-                    logging.info(f"No data found for panel: {panel_name}")
-                    continue
-                
-                # Get key mapping field (email field)
-                key_mapping = panel.get("key_mapping", {})
-                if not key_mapping:
-                    logging.warning(f"No key mapping found for panel: {panel_name}")
-                    continue
-                
-                # Determine the key field (email field) from the first mapping
-                first_mapping = next(iter(key_mapping.values()))
-                if not first_mapping:
-                    logging.warning(f"Invalid key mapping for panel: {panel_name}")
-                    continue
-                
-                # Extract the panel field (email field) from mapping
-                panel_field = list(first_mapping.keys())[0]
-                
-                # Get reconciliation details for this panel
-                panel_recons = recon_lookup.get(panel_name, [])
-                
-                # Process each user in the panel
-                for row in panel_rows:
-                    email_id = row.get(panel_field, "")
-                    if not email_id:
-                        continue  # Skip rows without email
-                    
-                    # Get reconciliation details for this panel
-                    recon_id = None
-                    recon_month = None
-                    
-                    if panel_recons:
-                        # Use the most recent reconciliation
-                        latest_recon = max(panel_recons, key=lambda x: x.get('start_date', '') or '')
-                        recon_id = latest_recon.get('recon_id', '')
-                        recon_month = latest_recon.get('recon_month', '')
-                    
-                    # Get status information
-                    initial_status = row.get('initial_status', '')
-                    final_status = row.get('final_status', '')
-                    
-                    # If no final_status, use initial_status
-                    if not final_status:
-                        final_status = initial_status
-                    
-                    user_summary = {
-                        "email_id": str(email_id).strip(),
-                        "recon_id": recon_id,
-                        "recon_month": recon_month,
-                        "panel_name": panel_name,
-                        "initial_status": initial_status,
-                        "final_status": final_status
-                    }
-                    
-                    all_users.append(user_summary)
-                
-                logging.info(f"Processed {len(panel_rows)} users from panel: {panel_name}")
-                
-            except Exception as e:
-                logging.error(f"Error processing panel {panel_name}: {e}")
-                continue
-        
-        # Sort by email_id for consistent ordering
-        all_users.sort(key=lambda x: x['email_id'].lower())
+        recon_summaries = list_recon_summaries()
+        
+        page = build_user_summary_page(
+            list_panels(),
+            recon_summaries,
+            limit,
+            cursor=cursor,
+            panel_name=panel_name,
+            status=status,
+            email_prefix=email_prefix,
+            include_total=include_total
+        )
         
-        logging.info(f"User-wise summary completed. Total users: {len(all_users)}")
+        logging.info(f"User-wise summary page returned {page['count']} users (more: {page['next_cursor'] is not None})")
+        return page
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Unexpected error in get_user_wise_summary: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}") 
+
+@router.get("/users/index/{email}")
+def lookup_user(email: str):
+    """
+    Panels an email appears in, with its statuses and the panel's latest recon_id (from user_panel_index).
+    """
+    try:
+        key = email.strip().lower()
+        entries = lookup_user_panels([key]).get(key, [])
+        return {"email": key, "panels": entries, "panel_count": len(entries)}
+    except Exception as e:
+        logging.error(f"Error looking up user '{email}': {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/users/index/lookup")
+def bulk_lookup_users(lookup: UserLookupRequest):
+    """
+    Bulk version of /users/index/{email} (e.g. a list of leavers for an access review).
+    Returns one entry per distinct normalized email, including emails found in no panel.
+    """
+    try:
+        found = lookup_user_panels(lookup.emails)
+        users = [{"email": email, "panels": entries, "panel_count": len(entries)} for email, entries in found.items()]
         return {
-            "total_users": len(all_users),
-            "users": all_users
+            "total_emails": len(users),
+            "found": sum(1 for user in users if user["panels"]),
+            "users": users
         }
-        
     except Exception as e:
-        logging.error(f"Unexpected error in get_user_wise_summary: {e}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}") 
\ No newline at end of file
+        logging.error(f"Error in bulk user lookup: {e}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/users/index/refresh")
+def refresh_user_index_endpoint(panel_name: Optional[str] = Form(None)):
+    """
+    Rebuild user_panel_index for one panel, or for every configured panel (initial backfill).
+    """
+    panel_names = [panel_name] if panel_name else [p["name"] for p in list_panels()]
+    results = {}
+    for name in panel_names:
+        success, error_msg = refresh_user_index(name)
+        results[name] = {"success": success, "error": error_msg}
+    return {
+        "refreshed": sum(1 for result in results.values() if result["success"]),
+        "failed": sum(1 for result in results.values() if not result["success"]),
+        "panels": results
+    }
@@ -0,0 +1,213 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from app.core.database.engine import engine
+
+# ts is derived from the dd-mm-yyyy hh:mm:ss timestamp in SQL, so spooled rows replay unchanged
+AUDIT_INSERT_SQL = text("""
+    INSERT INTO audit_trail (timestamp, action, user_name, details, status, ip_address, user_agent, created_at, ts)
+    VALUES (:timestamp, :action, :user_name, :details, :status, :ip_address, :user_agent, :created_at,
+            STR_TO_DATE(:timestamp, '%d-%m-%Y %H:%i:%s'))
+""")
+
+# Seconds between attempts to move spooled events back into MySQL
+SPOOL_RETRY_SECONDS = 30
+
+_STOP = object()
+
+
+class AuditWriter:
+    """
+    Writes audit events from a background thread.
+    Request handlers enqueue a prepared row and return immediately; the writer thread inserts
+    queued rows in multi-row batches once batch_size rows are waiting or flush_interval seconds
+    after the first row of a batch. Rows that cannot be written (MySQL down, queue full) are
+    appended to a JSON-lines spool file and replayed once MySQL accepts writes again.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float, spool_path: str,
+                 ensure_table: Optional[Callable[[], bool]] = None):
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._spool_path = spool_path
+        self._ensure_table = ensure_table
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+        self._table_ready = False
+        self._last_spool_retry = 0.0
+        self._stats = {"queued": 0, "written": 0, "spooled": 0, "replayed": 0, "failed_batches": 0}
+
+    def start(self):
+        """Create the audit table (once) and start the writer thread; safe to call repeatedly"""
+        with self._lock:
+            if self._thread is not None or self._stopped:
+                return
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+        self._prepare_table()
+        self.logger.info(
+            f"⚙️ AuditWriter started (batch {self._batch_size}, flush every {self._flush_interval}s, "
+            f"queue {self._queue.maxsize})"
+        )
+
+    def _prepare_table(self) -> bool:
+        if not self._table_ready and self._ensure_table is not None:
+            self._table_ready = bool(self._ensure_table())
+        return self._table_ready or self._ensure_table is None
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue one audit_trail row without blocking the caller.
+
+        Returns:
+            bool: True if queued (or written directly once the writer is stopped), False if it went to the spool file
+        """
+        if self._thread is None:
+            self.start()
+        if self._stopped:
+            return self._write([row])
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.logger.warning("Audit queue is full, spooling event to disk")
+            self._spool([row])
+            return False
+        with self._lock:
+            self._stats["queued"] += 1
+        return True
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = None
+            while len(batch) < self._batch_size:
+                timeout = self._flush_interval if deadline is None else deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self._flush_interval
+
+            if batch:
+                self._write(batch)
+            elif time.monotonic() - self._last_spool_retry >= SPOOL_RETRY_SECONDS:
+                self._replay_spool()
+
+        # Drain whatever was queued before the stop marker
+        remaining = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                remaining.append(item)
+        for start in range(0, len(remaining), self._batch_size):
+            self._write(remaining[start:start + self._batch_size])
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        if not self._prepare_table():
+            raise RuntimeError("audit_trail table is not available")
+        with engine.begin() as conn:
+            conn.execute(AUDIT_INSERT_SQL, rows)
+
+    def _write(self, rows: List[Dict[str, Any]]) -> bool:
+        """Insert one batch; spool it if MySQL rejects it"""
+        try:
+            self._insert(rows)
+        except Exception as e:
+            self.logger.error(f"Failed to write {len(rows)} audit events, spooling them: {e}")
+            with self._lock:
+                self._stats["failed_batches"] += 1
+            self._spool(rows)
+            return False
+        with self._lock:
+            self._stats["written"] += len(rows)
+        self.logger.debug(f"Audit batch written: {len(rows)} events")
+        return True
+
+    def _spool(self, rows: List[Dict[str, Any]], count: bool = True):
+        try:
+            with self._spool_lock:
+                os.makedirs(os.path.dirname(self._spool_path) or ".", exist_ok=True)
+                with open(self._spool_path, "a") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, default=str) + "\n")
+            if count:
+                with self._lock:
+                    self._stats["spooled"] += len(rows)
+        except Exception as e:
+            self.logger.error(f"Failed to spool {len(rows)} audit events, events lost: {e}")
+
+    def _replay_spool(self):
+        """Move spooled events back into MySQL; whatever fails stays in the spool"""
+        self._last_spool_retry = time.monotonic()
+        replay_path = self._spool_path + ".replay"
+        with self._spool_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self._spool_path):
+                    return
+                os.replace(self._spool_path, replay_path)
+
+        try:
+            with open(replay_path, "r") as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            self.logger.error(f"Failed to read audit spool {replay_path}: {e}")
+            return
+
+        replayed = 0
+        for start in range(0, len(rows), self._batch_size):
+            batch = rows[start:start + self._batch_size]
+            try:
+                self._insert(batch)
+            except Exception as e:
+                self.logger.warning(f"Audit spool replay paused, MySQL still unavailable: {e}")
+                self._spool(rows[start:], count=False)
+                break
+            replayed += len(batch)
+        os.remove(replay_path)
+        with self._lock:
+            self._stats["replayed"] += replayed
+        if replayed:
+            self.logger.info(f"📼 Replayed {replayed} spooled audit events")
+
+    def flush(self, timeout: float = 10.0):
+        """Stop the writer thread after it has written everything queued so far (used on shutdown)"""
+        with self._lock:
+            thread = self._thread
+            self._stopped = True
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            self.logger.warning("Audit queue still full on shutdown")
+        thread.join(timeout)
+        self.logger.info("🛑 AuditWriter flushed and stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["pending"] = self._queue.qsize()
+        stats["spool_file"] = os.path.exists(self._spool_path)
+        return stats
@@ -3,6 +3,9 @@ from typing import Optional, List, Dict
 import logging
 from .audit_utils import (
     get_audit_trail, 
+    get_audit_trail_page,
+    get_audit_breakdown,
+    InvalidAuditCursorError,
     get_audit_summary, 
     cleanup_old_audit_logs,
     AUDIT_ACTIONS
@@ -14,15 +17,17 @@ logger = logging.getLogger(__name__)
 @router.get("/trail")
 def get_audit_trail_endpoint(
     action: Optional[str] = Query(None, description="Filter by action type"),
-    user: Optional[str] = Query(None, description="Filter by user name"),
+    user: Optional[str] = Query(None, description="Filter by user name (prefix)"),
     status: Optional[str] = Query(None, description="Filter by status (success/failed)"),
     date_from: Optional[str] = Query(None, description="Filter from date (YYYY-MM-DD)"),
     date_to: Optional[str] = Query(None, description="Filter to date (YYYY-MM-DD)"),
     limit: int = Query(100, description="Maximum number of records to return"),
-    offset: int = Query(0, description="Number of records to skip")
+    offset: int = Query(0, description="Number of records to skip (ignored when cursor is set)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
 ):
     """
-    Get audit trail entries with optional filtering
+    Get audit trail entries with optional filtering, newest first.
+    Pass next_cursor back as cursor for the next page (keyset pagination; null on the last page).
     """
     try:
         filters = {}
@@ -37,16 +42,20 @@ def get_audit_trail_endpoint(
         if date_to:
             filters['date_to'] = date_to
         
-        audit_entries = get_audit_trail(filters, limit, offset)
+        page = get_audit_trail_page(filters, limit, cursor=cursor, offset=offset)
+        audit_entries = page["entries"]
         
         return {
             "audit_entries": audit_entries,
             "filters_applied": filters,
             "total_returned": len(audit_entries),
             "limit": limit,
-            "offset": offset
+            "offset": offset,
+            "next_cursor": page["next_cursor"]
         }
         
+    except InvalidAuditCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving audit trail: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve audit trail: {str(e)}")
@@ -96,27 +105,25 @@ def cleanup_audit_logs(
 @router.get("/user-activity/{user_name}")
 def get_user_activity(
     user_name: str,
-    limit: int = Query(50, description="Maximum number of records to return")
+    limit: int = Query(50, description="Maximum number of recent activities to return (at most 10)")
 ):
     """
-    Get audit trail for a specific user
+    Get audit trail for a specific user.
+    Statistics cover all of the user's entries (GROUP BY in MySQL); only the recent
+    entries are fetched as rows.
     """
     try:
-        filters = {"user": user_name}
-        user_entries = get_audit_trail(filters, limit, 0)
+        filters = {"user_name": user_name}
+        stats = get_audit_breakdown(filters, "action")
         
         # Calculate user statistics
-        total_actions = len(user_entries)
-        success_count = len([entry for entry in user_entries if entry.get('status') == 'success'])
+        total_actions = stats["total"]
+        success_count = stats["success_count"]
         failed_count = total_actions - success_count
         
         # Get action breakdown for this user
-        action_breakdown = {}
-        for entry in user_entries:
-            action = entry.get('action')
-            if action not in action_breakdown:
-                action_breakdown[action] = 0
-            action_breakdown[action] += 1
+        action_breakdown = stats["breakdown"]
+        user_entries = get_audit_trail(filters, min(limit, 10), 0)
         
         return {
             "user_name": user_name,
@@ -125,7 +132,7 @@ def get_user_activity(
             "failed_count": failed_count,
             "success_rate": (success_count / total_actions * 100) if total_actions > 0 else 0,
             "action_breakdown": action_breakdown,
-            "recent_activity": user_entries[:10]  # Last 10 activities
+            "recent_activity": user_entries  # Last 10 activities
         }
         
     except Exception as e:
@@ -139,30 +146,25 @@ def get_action_statistics(action: str):
     """
     try:
         filters = {"action": action}
-        action_entries = get_audit_trail(filters, 1000, 0)  # Get more entries for stats
+        stats = get_audit_breakdown(filters, "user_name")
         
-        if not action_entries:
+        if not stats["total"]:
             return {
                 "action": action,
                 "message": f"No audit entries found for action: {action}",
                 "total_entries": 0
             }
         
-        # Calculate statistics
-        total_entries = len(action_entries)
-        success_count = len([entry for entry in action_entries if entry.get('status') == 'success'])
+        # Calculate statistics (counted in MySQL over all entries of the action)
+        total_entries = stats["total"]
+        success_count = stats["success_count"]
         failed_count = total_entries - success_count
         
         # Get user breakdown for this action
-        user_breakdown = {}
-        for entry in action_entries:
-            user = entry.get('user_name')
-            if user not in user_breakdown:
-                user_breakdown[user] = 0
-            user_breakdown[user] += 1
+        user_breakdown = stats["breakdown"]
         
         # Get recent entries
-        recent_entries = action_entries[:10]
+        recent_entries = get_audit_trail(filters, 10, 0)
         
         return {
             "action": action,
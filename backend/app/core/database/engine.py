@@ -0,0 +1,114 @@
+import functools
+import logging
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config.settings import (
+    MYSQL_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING, BULK_LOAD_MODE
+)
+
+# Pool counters; kept outside the pool so they survive pool recreation (engine.dispose / invalidation)
+_pool_metrics = {
+    "checkouts": 0,
+    "checkins": 0,
+    "connects": 0,
+    "invalidations": 0,
+    "timeouts": 0,
+    "waits": 0,          # checkouts that took > 1 ms (waiting for a free connection or opening a new one)
+    "wait_seconds_total": 0.0,
+    "wait_seconds_max": 0.0
+}
+_pool_metrics_lock = threading.Lock()
+
+# Checkouts faster than this did not wait for a free connection
+WAIT_THRESHOLD_SECONDS = 0.001
+
+
+def _count(name, amount=1):
+    with _pool_metrics_lock:
+        _pool_metrics[name] += amount
+
+
+def _timed_connect(connect):
+    """
+    Wrap Engine.connect (engine.begin and pandas go through it too) to record how long getting a
+    connection took: waiting for a free one, opening a new one and the pre-ping. Only public API is
+    used, so nothing depends on pool internals.
+    """
+    @functools.wraps(connect)
+    def timed_connect(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return connect(*args, **kwargs)
+        except PoolTimeoutError:
+            _count("timeouts")
+            logging.warning(f"⏳ Connection pool exhausted for {DB_POOL_TIMEOUT}s: {engine.pool.status()}")
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            if waited > WAIT_THRESHOLD_SECONDS:
+                with _pool_metrics_lock:
+                    _pool_metrics["waits"] += 1
+                    _pool_metrics["wait_seconds_total"] += waited
+                    _pool_metrics["wait_seconds_max"] = max(_pool_metrics["wait_seconds_max"], waited)
+    return timed_connect
+
+
+# LOAD DATA LOCAL INFILE has to be allowed on the client side as well as on the server
+engine = create_engine(
+    MYSQL_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={"local_infile": BULK_LOAD_MODE == "load_data"}
+)
+engine.connect = _timed_connect(engine.connect)
+
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    _count("connects")
+
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _count("checkouts")
+
+
+@event.listens_for(engine, "checkin")
+def _on_checkin(dbapi_connection, connection_record):
+    _count("checkins")
+
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    _count("invalidations")
+
+
+def get_pool_stats():
+    """
+    Current pool occupancy plus the checkout/wait counters since startup.
+
+    Returns:
+        dict: Pool settings, checked_out/overflow/idle connections and the counters
+    """
+    pool = engine.pool
+    with _pool_metrics_lock:
+        metrics = dict(_pool_metrics)
+    metrics["wait_seconds_avg"] = metrics["wait_seconds_total"] / metrics["waits"] if metrics["waits"] else 0.0
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "timeout": DB_POOL_TIMEOUT,
+        "recycle": DB_POOL_RECYCLE,
+        "pre_ping": DB_POOL_PRE_PING,
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "idle": pool.checkedin(),
+        **metrics
+    }
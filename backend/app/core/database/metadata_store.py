@@ -0,0 +1,308 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import MetaData, Table, Column, String, Text, Integer, Index, UniqueConstraint, text, bindparam
+
+from app.config.settings import RECON_HISTORY_PATH, SOT_UPLOADS_PATH, RECON_SUMMARY_PATH
+from app.core.database.engine import engine
+
+# Upload history kinds: id field, entity field and the JSON file they used to live in
+UPLOAD_KINDS = {
+    "panel": {"id_field": "docid", "entity_field": "panelname", "json_path": RECON_HISTORY_PATH},
+    "sot": {"id_field": "doc_id", "entity_field": "sot_type", "json_path": SOT_UPLOADS_PATH},
+}
+
+UPLOAD_HISTORY_TABLE = "upload_history"
+# Hashes per IN (...) query in find_uploads_by_hashes
+HASH_LOOKUP_CHUNK = 1000
+RECON_SUMMARY_TABLE = "recon_summaries"
+
+_store_lock = threading.Lock()
+_store_ready = False
+
+
+def create_metadata_tables():
+    """Create the upload history and reconciliation summary tables if they don't exist"""
+    local_metadata = MetaData()
+    Table(UPLOAD_HISTORY_TABLE, local_metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('kind', String(20), nullable=False),
+        Column('doc_id', String(100), nullable=False),
+        Column('entity_name', String(255)),
+        Column('status', String(50)),
+        Column('file_hash', String(64)),
+        Column('record', Text, nullable=False),  # full upload record as JSON
+        UniqueConstraint('kind', 'doc_id', name='uq_upload_history_doc'),
+        Index('idx_upload_history_entity', 'kind', 'entity_name'),
+        # Duplicate-file index: (kind, file_hash, status) answers check_duplicate_file from the index
+        Index('idx_upload_history_hash', 'kind', 'file_hash', 'status')
+    )
+    Table(RECON_SUMMARY_TABLE, local_metadata,
+        Column('id', Integer, primary_key=True, autoincrement=True),
+        Column('recon_id', String(50), nullable=False, unique=True),
+        Column('panel_name', String(255), index=True),
+        Column('status', String(50)),
+        Column('start_date', String(20)),
+        Column('record', Text, nullable=False)  # full reconciliation record as JSON
+    )
+    local_metadata.create_all(engine, checkfirst=True)
+
+
+def init_metadata_store():
+    """Create the tables and run the one-time JSON migration (once per process)"""
+    global _store_ready
+    if _store_ready:
+        return
+    with _store_lock:
+        if _store_ready:
+            return
+        create_metadata_tables()
+        migrate_json_metadata()
+        _store_ready = True
+
+
+def _load_json_list(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except Exception as e:
+        logging.error(f"Failed to read {path} for migration: {e}")
+        return []
+
+
+def migrate_json_metadata():
+    """
+    One-time import of panel_history.json, sot_uploads.json and reconciliation_summary.json.
+    A kind is only imported while its table slice is still empty, so re-running is a no-op.
+    The JSON files are left in place untouched.
+    """
+    with engine.begin() as conn:
+        for kind, spec in UPLOAD_KINDS.items():
+            has_rows = conn.execute(text(f"SELECT 1 FROM `{UPLOAD_HISTORY_TABLE}` WHERE kind = :kind LIMIT 1"),
+                                    {"kind": kind}).first()
+            if has_rows:
+                continue
+            # Same id semantics as the JSON writer: a later record with the same id replaces the earlier one
+            records = {}
+            for record in _load_json_list(spec["json_path"]):
+                doc_id = record.get(spec["id_field"])
+                if doc_id:
+                    records.pop(doc_id, None)
+                    records[doc_id] = record
+            for record in records.values():
+                conn.execute(_upload_insert_stmt(), _upload_params(kind, record))
+            if records:
+                logging.info(f"📦 Migrated {len(records)} {kind} upload records from {spec['json_path']}")
+
+        has_rows = conn.execute(text(f"SELECT 1 FROM `{RECON_SUMMARY_TABLE}` LIMIT 1")).first()
+        if not has_rows:
+            summaries = {}
+            for record in _load_json_list(RECON_SUMMARY_PATH):
+                if record.get("recon_id"):
+                    summaries.setdefault(record["recon_id"], record)
+            for record in summaries.values():
+                conn.execute(_recon_insert_stmt(), _recon_params(record))
+            if summaries:
+                logging.info(f"📦 Migrated {len(summaries)} reconciliation summaries from {RECON_SUMMARY_PATH}")
+
+
+# Upload history (formerly panel_history.json / sot_uploads.json)
+
+def _upload_insert_stmt():
+    return text(
+        f"INSERT INTO `{UPLOAD_HISTORY_TABLE}` (kind, doc_id, entity_name, status, file_hash, record) "
+        f"VALUES (:kind, :doc_id, :entity_name, :status, :file_hash, :record)"
+    )
+
+
+def _upload_params(kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    spec = UPLOAD_KINDS[kind]
+    return {
+        "kind": kind,
+        "doc_id": record.get(spec["id_field"]),
+        "entity_name": record.get(spec["entity_field"]),
+        "status": record.get("status"),
+        "file_hash": record.get("file_hash"),
+        "record": json.dumps(record, default=str)
+    }
+
+
+def save_upload_record(kind: str, record: Dict[str, Any]):
+    """
+    Insert or replace an upload record (matched on its doc id). Like the JSON writer, a replaced
+    record moves to the end of the history. One short transaction, safe for concurrent upload jobs.
+
+    Args:
+        kind: "panel" or "sot"
+        record: Upload record (docid/panelname for panels, doc_id/sot_type for SOTs)
+    """
+    init_metadata_store()
+    params = _upload_params(kind, record)
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM `{UPLOAD_HISTORY_TABLE}` WHERE kind = :kind AND doc_id = :doc_id"),
+                     {"kind": kind, "doc_id": params["doc_id"]})
+        conn.execute(_upload_insert_stmt(), params)
+
+
+def _select_upload_records(where: str, params: Dict[str, Any], limit: Optional[int] = None,
+                           statuses: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    init_metadata_store()
+    query = f"SELECT record FROM `{UPLOAD_HISTORY_TABLE}` WHERE {where}"
+    if statuses is not None:
+        query += " AND status IN :statuses"
+        params = dict(params, statuses=list(statuses))
+    query += " ORDER BY id"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    stmt = text(query)
+    if statuses is not None:
+        stmt = stmt.bindparams(bindparam("statuses", expanding=True))
+    with engine.connect() as conn:
+        return [json.loads(row[0]) for row in conn.execute(stmt, params)]
+
+
+def list_upload_records(kind: str) -> List[Dict[str, Any]]:
+    """All upload records of a kind, oldest first (the JSON file order)"""
+    return _select_upload_records("kind = :kind", {"kind": kind})
+
+
+def get_upload_record(kind: str, doc_id: str) -> Optional[Dict[str, Any]]:
+    records = _select_upload_records("kind = :kind AND doc_id = :doc_id", {"kind": kind, "doc_id": doc_id})
+    return records[0] if records else None
+
+
+def list_entity_uploads(kind: str, entity_name: str) -> List[Dict[str, Any]]:
+    """Upload records of one panel / SOT type, oldest first"""
+    return _select_upload_records("kind = :kind AND entity_name = :entity_name", {"kind": kind, "entity_name": entity_name})
+
+
+def find_upload_by_hash(kind: str, file_hash: str, statuses: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+    """First (oldest) upload of a kind with this file hash, optionally limited to the given statuses"""
+    records = _select_upload_records("kind = :kind AND file_hash = :file_hash", {"kind": kind, "file_hash": file_hash},
+                                     limit=1, statuses=statuses)
+    return records[0] if records else None
+
+
+def find_uploads_by_hashes(kind: str, file_hashes: List[str], statuses: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Bulk find_upload_by_hash: one indexed IN (...) query per HASH_LOOKUP_CHUNK hashes.
+
+    Returns:
+        dict: file_hash -> first (oldest) matching upload record, for the hashes that have one
+    """
+    init_metadata_store()
+    hashes = list(dict.fromkeys(h for h in file_hashes if h))
+    found = {}
+    if not hashes:
+        return found
+
+    query = f"SELECT file_hash, record FROM `{UPLOAD_HISTORY_TABLE}` WHERE kind = :kind AND file_hash IN :hashes"
+    binds = [bindparam("hashes", expanding=True)]
+    if statuses is not None:
+        query += " AND status IN :statuses"
+        binds.append(bindparam("statuses", expanding=True))
+    stmt = text(query + " ORDER BY id").bindparams(*binds)
+
+    with engine.connect() as conn:
+        for start in range(0, len(hashes), HASH_LOOKUP_CHUNK):
+            params = {"kind": kind, "hashes": hashes[start:start + HASH_LOOKUP_CHUNK]}
+            if statuses is not None:
+                params["statuses"] = list(statuses)
+            for file_hash, record in conn.execute(stmt, params):
+                if file_hash not in found:
+                    found[file_hash] = json.loads(record)
+    return found
+
+
+def update_upload_history_status(panel_name: str, new_status: str) -> bool:
+    """
+    Update the status of the most recent upload for a panel in the upload history.
+    """
+    try:
+        updated = update_latest_upload_status("panel", panel_name, new_status)
+        if updated:
+            logging.info(f"Updated upload history status for panel '{panel_name}' to '{new_status}'")
+        return updated
+    except Exception as e:
+        logging.error(f"Failed to update upload history status: {e}")
+        return False
+
+
+def update_latest_upload_status(kind: str, entity_name: str, new_status: str) -> bool:
+    """
+    Set the status of the most recent upload of a panel / SOT type.
+
+    Returns:
+        bool: True if an upload record was updated
+    """
+    init_metadata_store()
+    with engine.begin() as conn:
+        row = conn.execute(text(
+            f"SELECT id, record FROM `{UPLOAD_HISTORY_TABLE}` WHERE kind = :kind AND entity_name = :entity_name "
+            f"ORDER BY id DESC LIMIT 1 FOR UPDATE"
+        ), {"kind": kind, "entity_name": entity_name}).first()
+        if row is None:
+            return False
+        record = json.loads(row[1])
+        record["status"] = new_status
+        conn.execute(text(f"UPDATE `{UPLOAD_HISTORY_TABLE}` SET status = :status, record = :record WHERE id = :id"),
+                     {"status": new_status, "record": json.dumps(record, default=str), "id": row[0]})
+    return True
+
+
+# Reconciliation summaries (formerly reconciliation_summary.json)
+
+def _recon_insert_stmt():
+    return text(
+        f"INSERT INTO `{RECON_SUMMARY_TABLE}` (recon_id, panel_name, status, start_date, record) "
+        f"VALUES (:recon_id, :panel_name, :status, :start_date, :record)"
+    )
+
+
+def _recon_params(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "recon_id": record.get("recon_id"),
+        "panel_name": record.get("panelname"),
+        "status": record.get("status"),
+        "start_date": record.get("start_date"),
+        "record": json.dumps(record, default=str)
+    }
+
+
+def append_recon_summary(record: Dict[str, Any]):
+    """Append a reconciliation record (append-only, one INSERT)"""
+    init_metadata_store()
+    with engine.begin() as conn:
+        conn.execute(_recon_insert_stmt(), _recon_params(record))
+
+
+def list_recon_summaries(panel_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Reconciliation records in the order they were written, optionally for one panel"""
+    init_metadata_store()
+    query = f"SELECT record FROM `{RECON_SUMMARY_TABLE}`"
+    params = {}
+    if panel_name is not None:
+        query += " WHERE panel_name = :panel_name"
+        params["panel_name"] = panel_name
+    with engine.connect() as conn:
+        return [json.loads(row[0]) for row in conn.execute(text(query + " ORDER BY id"), params)]
+
+
+def get_recon_summary(recon_id: str) -> Optional[Dict[str, Any]]:
+    init_metadata_store()
+    with engine.connect() as conn:
+        row = conn.execute(text(f"SELECT record FROM `{RECON_SUMMARY_TABLE}` WHERE recon_id = :recon_id"),
+                           {"recon_id": recon_id}).first()
+    return json.loads(row[0]) if row else None
+
+
+if __name__ == "__main__":
+    # python -m app.core.database.metadata_store  -> create tables and import the JSON files
+    logging.basicConfig(level=logging.INFO)
+    init_metadata_store()
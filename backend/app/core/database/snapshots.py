@@ -0,0 +1,461 @@
+import csv
+import gzip
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import MetaData, Table, Column, String, Text, Integer, BigInteger, DateTime, Index, UniqueConstraint, text
+
+from app.config.settings import UPLOAD_SPOOL_DIR, SNAPSHOT_RETENTION
+from app.core.database.engine import engine
+from app.core.database.mysql_utils import (
+    _to_infile_value, _from_infile_value, iter_rows, table_exists, table_has_rows,
+    get_table_column_names, get_table_schema, add_column_if_not_exists, clear_table_data,
+    bulk_load_rows, ensure_key_indexes, get_previous_upload_metadata, clear_panel_status, PANEL_STATUS_COLUMNS
+)
+from app.utils.file_server_manager import file_server_manager
+from app.utils.file_utils import get_key_columns, get_panel_status_key
+
+SNAPSHOT_CATALOG_TABLE = "upload_snapshots"
+# Snapshot files live under <base>/snapshots/<table>/upload/<doc_id>.gz on the file server
+SNAPSHOT_UPLOAD_TYPE = "snapshots"
+SNAPSHOT_STAGE = "upload"
+SNAPSHOT_FILENAME = "snapshot.csv.gz"
+# Placeholder doc_ids returned by get_previous_upload_metadata when the upload history has no entry
+UNTRACKED_DOC_IDS = ("initial_upload", "unknown")
+
+_catalog_lock = threading.Lock()
+_catalog_ready = False
+
+
+def create_snapshot_catalog_table():
+    """Create the snapshot catalog table (one row per table and superseded upload) if it doesn't exist"""
+    global _catalog_ready
+    if _catalog_ready:
+        return
+    with _catalog_lock:
+        if _catalog_ready:
+            return
+        local_metadata = MetaData()
+        Table(SNAPSHOT_CATALOG_TABLE, local_metadata,
+            Column('id', Integer, primary_key=True, autoincrement=True),
+            Column('table_name', String(255), nullable=False),
+            Column('doc_id', String(100), nullable=False),
+            Column('upload_timestamp', String(50)),  # timestamp of the upload the snapshot holds
+            Column('snapshot_ts', DateTime, nullable=False),
+            Column('row_count', Integer, nullable=False),
+            Column('column_names', Text, nullable=False),  # column names as JSON, in file order
+            Column('file_path', Text, nullable=False),
+            Column('size_bytes', BigInteger),
+            Column('server_type', String(20)),
+            Column('restored_at', DateTime),  # set while the table holds this snapshot after a restore
+            UniqueConstraint('table_name', 'doc_id', name='uq_upload_snapshots_doc'),
+            Index('idx_upload_snapshots_ts', 'table_name', 'snapshot_ts')
+        )
+        local_metadata.create_all(engine, checkfirst=True)
+        _catalog_ready = True
+
+
+def _snapshot_entry(row) -> Dict[str, Any]:
+    entry = dict(row._mapping)
+    entry["column_names"] = json.loads(entry["column_names"])
+    for field in ("snapshot_ts", "restored_at"):
+        if entry.get(field) is not None:
+            entry[field] = str(entry[field])[:19]
+    return entry
+
+
+def get_snapshot(table_name: str, doc_id: str) -> Optional[Dict[str, Any]]:
+    """Catalog entry of one snapshot, or None"""
+    create_snapshot_catalog_table()
+    table_name = table_name.replace(" ", "_").lower()
+    with engine.connect() as conn:
+        row = conn.execute(
+            text(f"SELECT * FROM {SNAPSHOT_CATALOG_TABLE} WHERE table_name = :table_name AND doc_id = :doc_id"),
+            {"table_name": table_name, "doc_id": doc_id}
+        ).first()
+    return _snapshot_entry(row) if row else None
+
+
+def list_snapshots(table_name: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    """
+    Catalog entries, newest first.
+
+    Args:
+        table_name (str): Only snapshots of this panel/SOT table (all tables if not given)
+        limit (int): Maximum number of entries
+
+    Returns:
+        list: Catalog entries (doc_id, upload_timestamp, snapshot_ts, row_count, column_names, file_path, ...)
+    """
+    create_snapshot_catalog_table()
+    query = f"SELECT * FROM {SNAPSHOT_CATALOG_TABLE}"
+    params: Dict[str, Any] = {"limit": limit}
+    if table_name:
+        query += " WHERE table_name = :table_name"
+        params["table_name"] = table_name.replace(" ", "_").lower()
+    query += " ORDER BY snapshot_ts DESC, id DESC LIMIT :limit"
+    with engine.connect() as conn:
+        return [_snapshot_entry(row) for row in conn.execute(text(query), params)]
+
+
+def _live_doc_id(table_name: str) -> Optional[str]:
+    """doc_id of the snapshot the table was last restored from, if no upload replaced it since"""
+    with engine.connect() as conn:
+        return conn.execute(
+            text(f"SELECT doc_id FROM {SNAPSHOT_CATALOG_TABLE} WHERE table_name = :table_name AND restored_at IS NOT NULL "
+                 "ORDER BY restored_at DESC LIMIT 1"),
+            {"table_name": table_name}
+        ).scalar()
+
+
+def _write_snapshot_file(table_name: str, columns: List[str], path: str) -> int:
+    """Stream the table into a gzip CSV (header row, NULL as \\N); returns the number of rows"""
+    row_count = 0
+    with gzip.open(path, "wt", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+        for batch in iter_rows(table_name, columns=columns, row_format="tuples"):
+            writer.writerows([_to_infile_value(value) for value in row] for row in batch)
+            row_count += len(batch)
+    return row_count
+
+
+def snapshot_table(table_name: str, doc_id: str, upload_timestamp: str, source_table: Optional[str] = None):
+    """
+    Store the current contents of a panel/SOT table as a gzip CSV snapshot on the file server
+    and record it in the catalog. A snapshot for the same (table, doc_id) is replaced.
+
+    Args:
+        table_name (str): Table to snapshot
+        doc_id (str): Document ID of the upload the table currently holds
+        upload_timestamp (str): Timestamp of that upload
+        source_table (str): Table to read instead of table_name (e.g. the table swapped out by swap_panel_table)
+
+    Returns:
+        tuple: (success: bool, error_message: str or None, row_count: int)
+    """
+    table_name = table_name.replace(" ", "_").lower()
+    source_table = source_table or table_name
+    try:
+        create_snapshot_catalog_table()
+        if not table_exists(source_table) or not table_has_rows(source_table):
+            logging.info(f"No existing data to snapshot for table '{table_name}'")
+            return True, None, 0
+
+        snapshot_ts = datetime.now()
+        if doc_id in UNTRACKED_DOC_IDS:
+            doc_id = f"{doc_id}_{snapshot_ts.strftime('%Y%m%d%H%M%S')}"
+        columns = get_table_column_names(source_table)
+
+        fd, path = tempfile.mkstemp(prefix="reconify_snapshot_", suffix=".csv.gz", dir=UPLOAD_SPOOL_DIR)
+        os.close(fd)
+        try:
+            row_count = _write_snapshot_file(source_table, columns, path)
+            saved = file_server_manager.save_uploaded_file_from_path(
+                path, SNAPSHOT_FILENAME, SNAPSHOT_UPLOAD_TYPE, table_name, doc_id
+            )
+        finally:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f"Failed to remove snapshot file {path}: {e}")
+
+        params = {
+            "table_name": table_name,
+            "doc_id": doc_id,
+            "upload_timestamp": upload_timestamp,
+            "snapshot_ts": snapshot_ts,
+            "row_count": row_count,
+            "column_names": json.dumps(columns),
+            "file_path": saved["file_path"],
+            "size_bytes": saved["size"],
+            "server_type": saved["server_type"]
+        }
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"DELETE FROM {SNAPSHOT_CATALOG_TABLE} WHERE table_name = :table_name AND doc_id = :doc_id"), params
+            )
+            conn.execute(text(
+                f"INSERT INTO {SNAPSHOT_CATALOG_TABLE} (table_name, doc_id, upload_timestamp, snapshot_ts, row_count, "
+                "column_names, file_path, size_bytes, server_type) VALUES (:table_name, :doc_id, :upload_timestamp, "
+                ":snapshot_ts, :row_count, :column_names, :file_path, :size_bytes, :server_type)"
+            ), params)
+
+        logging.info(f"📸 Snapshot of '{table_name}' stored for doc_id {doc_id}: {row_count} rows, {saved['size']} bytes")
+        prune_snapshots(table_name)
+        return True, None, row_count
+
+    except Exception as e:
+        error_msg = f"Error creating snapshot of '{table_name}': {str(e)}"
+        logging.error(error_msg)
+        return False, error_msg, 0
+
+
+def snapshot_superseded_upload(table_name: str, doc_id: str, upload_timestamp: str, source_table: Optional[str] = None):
+    """
+    Snapshot a table before an upload replaces its data (see backup_existing_data).
+    The snapshot is keyed by the doc_id of the data being replaced: the restored snapshot
+    if the table was restored since its last upload, otherwise the previous upload.
+
+    Args:
+        table_name (str): Table about to be replaced
+        doc_id (str): Document ID of the new upload
+        upload_timestamp (str): Timestamp of the new upload
+        source_table (str): Table holding the replaced data, if it is no longer table_name
+
+    Returns:
+        tuple: (success: bool, error_message: str or None, row_count: int)
+    """
+    table_name = table_name.replace(" ", "_").lower()
+    try:
+        create_snapshot_catalog_table()
+        live_doc_id = _live_doc_id(table_name)
+    except Exception as e:
+        return False, f"Error reading snapshot catalog: {str(e)}", 0
+
+    if live_doc_id:
+        live = get_snapshot(table_name, live_doc_id)
+        previous_doc_id, previous_upload_timestamp = live_doc_id, live.get("upload_timestamp") if live else None
+    else:
+        previous_doc_id, previous_upload_timestamp = get_previous_upload_metadata(table_name, doc_id, upload_timestamp)
+
+    result = snapshot_table(table_name, previous_doc_id, previous_upload_timestamp, source_table)
+    if result[0]:
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"UPDATE {SNAPSHOT_CATALOG_TABLE} SET restored_at = NULL WHERE table_name = :table_name"),
+                {"table_name": table_name}
+            )
+    return result
+
+
+def prune_snapshots(table_name: str, keep: int = SNAPSHOT_RETENTION) -> int:
+    """
+    Delete all but the newest `keep` snapshots of a table (files and catalog rows).
+    keep <= 0 keeps every snapshot.
+
+    Returns:
+        int: Number of snapshots deleted
+    """
+    if keep <= 0:
+        return 0
+    table_name = table_name.replace(" ", "_").lower()
+    with engine.connect() as conn:
+        expired = conn.execute(
+            text(f"SELECT id, doc_id FROM {SNAPSHOT_CATALOG_TABLE} WHERE table_name = :table_name "
+                 "ORDER BY snapshot_ts DESC, id DESC"),
+            {"table_name": table_name}
+        ).fetchall()[keep:]
+    for snapshot_id, doc_id in expired:
+        file_server_manager.cleanup_failed_upload(doc_id, SNAPSHOT_FILENAME, SNAPSHOT_UPLOAD_TYPE, table_name, SNAPSHOT_STAGE)
+        with engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {SNAPSHOT_CATALOG_TABLE} WHERE id = :id"), {"id": snapshot_id})
+    if expired:
+        logging.info(f"🧹 Pruned {len(expired)} old snapshots of '{table_name}' (keeping {keep})")
+    return len(expired)
+
+
+@contextmanager
+def open_snapshot(table_name: str, doc_id: str):
+    """
+    Open a snapshot file for reading.
+
+    Yields:
+        tuple: (columns: list, rows: iterator of value lists with NULLs restored as None)
+    """
+    table_name = table_name.replace(" ", "_").lower()
+    with file_server_manager.local_copy(doc_id, SNAPSHOT_FILENAME, SNAPSHOT_UPLOAD_TYPE, table_name, SNAPSHOT_STAGE) as path:
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            columns = next(reader, [])
+            yield columns, ([_from_infile_value(value) for value in values] for values in reader)
+
+
+def restore_snapshot(table_name: str, doc_id: str):
+    """
+    Replace the contents of a table with a stored snapshot.
+    The current contents are snapshotted first, so a restore can itself be undone.
+    Snapshot columns the table no longer has are added back as TEXT columns. A panel's statuses
+    are reset (status columns in snapshots taken before panel_status existed are skipped).
+
+    Args:
+        table_name (str): Panel/SOT table to restore
+        doc_id (str): Document ID of the snapshot to restore
+
+    Returns:
+        tuple: (success: bool, error_message: str or None, summary dict with restored rows and
+                the doc_id the previous contents were snapshotted under)
+    """
+    table_name = table_name.replace(" ", "_").lower()
+    try:
+        snapshot = get_snapshot(table_name, doc_id)
+        if not snapshot:
+            return False, f"No snapshot of '{table_name}' for doc_id {doc_id}", None
+        if not table_exists(table_name):
+            return False, f"Table '{table_name}' does not exist", None
+
+        live_doc_id = _live_doc_id(table_name)
+        if live_doc_id == doc_id:
+            current_doc_id = doc_id
+        else:
+            if live_doc_id:
+                live = get_snapshot(table_name, live_doc_id)
+                current_doc_id, current_timestamp = live_doc_id, live.get("upload_timestamp") if live else None
+            else:
+                current_doc_id, current_timestamp = get_previous_upload_metadata(table_name, None, None)
+            success, error, _ = snapshot_table(table_name, current_doc_id, current_timestamp)
+            if not success:
+                return False, f"Could not snapshot current data before restore: {error}", None
+
+        existing = set(get_table_column_names(table_name))
+        skipped = set(PANEL_STATUS_COLUMNS) if get_panel_status_key(table_name) else set()
+        for column in snapshot["column_names"]:
+            if column not in existing and column not in skipped:
+                add_column_if_not_exists(table_name, column, "TEXT")
+
+        success, error = clear_table_data(table_name)
+        if not success:
+            return False, f"Failed to clear existing data: {error}", None
+        with open_snapshot(table_name, doc_id) as (columns, rows):
+            loaded = [i for i, col in enumerate(columns) if col not in skipped]
+            load = bulk_load_rows(
+                get_table_schema(table_name),
+                ({columns[i]: values[i] for i in loaded} for values in rows)
+            )
+        ensure_key_indexes(table_name)
+        if skipped:
+            clear_panel_status(table_name)
+
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"UPDATE {SNAPSHOT_CATALOG_TABLE} SET restored_at = CASE WHEN doc_id = :doc_id THEN :now ELSE NULL END "
+                     "WHERE table_name = :table_name"),
+                {"table_name": table_name, "doc_id": doc_id, "now": datetime.now()}
+            )
+        logging.info(f"⏪ Restored '{table_name}' from snapshot {doc_id}: {load['rows']} rows")
+        return True, None, {
+            "table_name": table_name,
+            "doc_id": doc_id,
+            "restored_rows": load["rows"],
+            "previous_doc_id": current_doc_id
+        }
+
+    except Exception as e:
+        error_msg = f"Error restoring snapshot {doc_id} of '{table_name}': {str(e)}"
+        logging.error(error_msg)
+        return False, error_msg, None
+
+
+def diff_snapshots(table_name: str, from_doc_id: str, to_doc_id: str, key_field: Optional[str] = None, sample_size: int = 20):
+    """
+    Compare two snapshots of a table. Rows are matched on key_field (the table's first
+    key_mapping column by default); without a usable key whole rows are compared, so changed
+    rows show up as one removed and one added row. Only the older snapshot is held in memory.
+
+    Args:
+        table_name (str): Panel/SOT table
+        from_doc_id (str): Snapshot to compare from
+        to_doc_id (str): Snapshot to compare to
+        key_field (str): Column identifying a row
+        sample_size (int): Rows listed per category
+
+    Returns:
+        tuple: (success: bool, error_message: str or None, diff dict with added/removed columns,
+                added/removed/changed/unchanged counts and sample rows)
+    """
+    table_name = table_name.replace(" ", "_").lower()
+    try:
+        for doc_id in (from_doc_id, to_doc_id):
+            if not get_snapshot(table_name, doc_id):
+                return False, f"No snapshot of '{table_name}' for doc_id {doc_id}", None
+
+        counts = {"added": 0, "removed": 0, "changed": 0, "unchanged": 0}
+        samples = {"added": [], "removed": [], "changed": []}
+
+        def sample(category, item):
+            if len(samples[category]) < sample_size:
+                samples[category].append(item)
+
+        with open_snapshot(table_name, from_doc_id) as (from_columns, from_rows):
+            if key_field is None:
+                key_field = next(iter(get_key_columns(table_name)), None)
+            keyed = key_field in from_columns
+            if keyed:
+                key_index = from_columns.index(key_field)
+                previous = {}
+                duplicate_keys = 0
+                for values in from_rows:
+                    key = values[key_index]
+                    duplicate_keys += key in previous
+                    previous[key] = values
+            else:
+                previous = Counter(tuple(values) for values in from_rows)
+
+        with open_snapshot(table_name, to_doc_id) as (to_columns, to_rows):
+            common = [col for col in from_columns if col in to_columns]
+            from_positions = [from_columns.index(col) for col in common]
+            to_positions = [to_columns.index(col) for col in common]
+            if keyed and key_field not in to_columns:
+                return False, f"Key column '{key_field}' is missing from snapshot {to_doc_id}", None
+
+            if keyed:
+                to_key_index = to_columns.index(key_field)
+                for values in to_rows:
+                    old = previous.pop(values[to_key_index], None)
+                    if old is None:
+                        counts["added"] += 1
+                        sample("added", dict(zip(to_columns, values)))
+                        continue
+                    changes = {
+                        col: [old[f], values[t]]
+                        for col, f, t in zip(common, from_positions, to_positions) if old[f] != values[t]
+                    }
+                    if changes:
+                        counts["changed"] += 1
+                        sample("changed", {"key": values[to_key_index], "changes": changes})
+                    else:
+                        counts["unchanged"] += 1
+                for values in previous.values():
+                    counts["removed"] += 1
+                    sample("removed", dict(zip(from_columns, values)))
+            else:
+                # Whole-row comparison on the shared columns
+                previous = Counter(tuple(row[f] for f in from_positions) for row in previous.elements())
+                for values in to_rows:
+                    row = tuple(values[t] for t in to_positions)
+                    if previous[row] > 0:
+                        previous[row] -= 1
+                        counts["unchanged"] += 1
+                    else:
+                        counts["added"] += 1
+                        sample("added", dict(zip(to_columns, values)))
+                for row, remaining in previous.items():
+                    for _ in range(remaining):
+                        counts["removed"] += 1
+                        sample("removed", dict(zip(common, row)))
+
+        diff = {
+            "table_name": table_name,
+            "from_doc_id": from_doc_id,
+            "to_doc_id": to_doc_id,
+            "key_field": key_field if keyed else None,
+            "columns_added": [col for col in to_columns if col not in from_columns],
+            "columns_removed": [col for col in from_columns if col not in to_columns],
+            **counts,
+            "samples": samples
+        }
+        if keyed and duplicate_keys:
+            diff["duplicate_keys"] = duplicate_keys
+        return True, None, diff
+
+    except Exception as e:
+        error_msg = f"Error comparing snapshots of '{table_name}': {str(e)}"
+        logging.error(error_msg)
+        return False, error_msg, None
@@ -0,0 +1,146 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from app.config.settings import UPLOAD_JOB_WORKERS, UPLOAD_JOB_MAX_PENDING, UPLOAD_JOB_RETENTION
+from app.utils.timestamp import get_ist_timestamp
+
+# Job lifecycle states (the upload stage is tracked separately in "stage")
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+TERMINAL_JOB_STATES = {JOB_COMPLETED, JOB_FAILED}
+
+
+class JobQueueFullError(Exception):
+    """Raised when the upload job queue has no free slots"""
+
+
+class UploadJobManager:
+    """
+    Runs upload pipelines on a bounded worker pool keyed by doc_id.
+    Request handlers submit a job and return immediately; clients poll the job status.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, retention: int):
+        self.logger = logging.getLogger(__name__)
+        self._max_workers = max_workers
+        self._max_pending = max_pending
+        self._retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="upload-job")
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Queued + running jobs; bounded so month-end bursts get rejected instead of piling up
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.logger.info(f"⚙️ UploadJobManager initialized with {max_workers} workers, {max_pending} pending slots")
+
+    def submit(self, doc_id: str, job_type: str, entity_name: str, func: Callable[..., Any], *args, **kwargs) -> Dict[str, Any]:
+        """Queue func(*args, **kwargs) as the job for doc_id and return the job record"""
+        if not self._slots.acquire(blocking=False):
+            raise JobQueueFullError(f"Upload queue is full ({self._max_pending} pending jobs). Please try again later.")
+
+        job = {
+            "doc_id": doc_id,
+            "job_type": job_type,
+            "entity_name": entity_name,
+            "status": JOB_QUEUED,
+            "stage": "uploading",
+            "submitted_at": get_ist_timestamp(),
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None
+        }
+        with self._lock:
+            self._jobs[doc_id] = job
+            self._prune_locked()
+
+        try:
+            self._executor.submit(self._run, doc_id, func, args, kwargs)
+        except RuntimeError as e:
+            # Executor already shut down
+            self._slots.release()
+            self._finish(doc_id, JOB_FAILED, error=str(e))
+            raise
+
+        self.logger.info(f"📥 Queued {job_type} job for '{entity_name}' (doc_id: {doc_id})")
+        return self.get(doc_id)
+
+    def _run(self, doc_id: str, func: Callable[..., Any], args: tuple, kwargs: dict):
+        self._set(doc_id, status=JOB_RUNNING, started_at=get_ist_timestamp())
+        try:
+            result = func(*args, **kwargs)
+            failed = isinstance(result, dict) and result.get("status") == "failed"
+            self._finish(
+                doc_id,
+                JOB_FAILED if failed else JOB_COMPLETED,
+                result=result,
+                error=result.get("error") if isinstance(result, dict) else None
+            )
+        except Exception as e:
+            self.logger.error(f"❌ Upload job crashed (doc_id: {doc_id}): {e}")
+            self._finish(doc_id, JOB_FAILED, error=str(e))
+        finally:
+            self._slots.release()
+
+    def _finish(self, doc_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        self._set(doc_id, status=status, result=result, error=error, finished_at=get_ist_timestamp())
+
+    def _set(self, doc_id: str, **fields):
+        with self._lock:
+            job = self._jobs.get(doc_id)
+            if job is not None:
+                job.update(fields)
+
+    def _prune_locked(self):
+        """Drop the oldest finished jobs once the retention limit is exceeded"""
+        if len(self._jobs) <= self._retention:
+            return
+        for job_id in list(self._jobs.keys()):
+            if len(self._jobs) <= self._retention:
+                break
+            if self._jobs[job_id]["status"] in TERMINAL_JOB_STATES:
+                del self._jobs[job_id]
+
+    def update_stage(self, doc_id: str, stage: str):
+        """Record the current upload stage (uploading/uploaded/processing/processed/failed)"""
+        self._set(doc_id, stage=stage)
+
+    def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(doc_id)
+            return dict(job) if job is not None else None
+
+    def list_jobs(self, job_type: Optional[str] = None, active_only: bool = False) -> List[Dict[str, Any]]:
+        with self._lock:
+            jobs = [dict(job) for job in self._jobs.values()]
+        if job_type:
+            jobs = [job for job in jobs if job["job_type"] == job_type]
+        if active_only:
+            jobs = [job for job in jobs if job["status"] not in TERMINAL_JOB_STATES]
+        return jobs
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+        return {
+            "max_workers": self._max_workers,
+            "max_pending": self._max_pending,
+            "queued": statuses.count(JOB_QUEUED),
+            "running": statuses.count(JOB_RUNNING),
+            "completed": statuses.count(JOB_COMPLETED),
+            "failed": statuses.count(JOB_FAILED)
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and cancel the ones that have not started yet"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self.logger.info("🛑 UploadJobManager shut down")
+
+
+# Global instance for easy import
+upload_job_manager = UploadJobManager(UPLOAD_JOB_WORKERS, UPLOAD_JOB_MAX_PENDING, UPLOAD_JOB_RETENTION)
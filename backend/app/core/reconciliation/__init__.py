@@ -0,0 +1 @@
+# Reconciliation Package 
\ No newline at end of file
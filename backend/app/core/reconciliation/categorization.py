@@ -0,0 +1,256 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.config.settings import CATEGORIZE_FETCH_WORKERS
+from app.core.database.mysql_utils import fetch_rows
+from app.utils.file_utils import extract_mapping_fields
+
+# SOTs checked by categorize_users, highest priority first
+PRIORITY_SOTS = ["service_users", "internal_users", "thirdparty_users", "third_party_users"]
+# SOTs matched on the email domain when their SOT field is "domain"
+DOMAIN_SOTS = ["internal_users", "thirdparty_users", "third_party_users"]
+# SOT columns that carry the user type, first non-empty one wins
+USER_TYPE_FIELDS = ["user_type", "usertype", "type", "status", "category"]
+
+
+def normalize_sot_name(sot_name: str) -> str:
+    """Normalize SOT names to handle variations like thirdparty_users and third_party_users"""
+    if sot_name in ["thirdparty_users", "third_party_users"]:
+        return "thirdparty_users"
+    return sot_name
+
+
+def panel_columns_needed(key_mapping: dict, configured_sots: List[str], match_field: str) -> List[str]:
+    """Panel columns read by the categorization (mapped panel fields + match field)"""
+    columns = [match_field]
+    for sot in configured_sots:
+        panel_field, _ = extract_mapping_fields(key_mapping.get(sot, {}))
+        if panel_field:
+            columns.append(panel_field)
+    return list(dict.fromkeys(columns))
+
+
+def sot_columns_needed(mapping: dict) -> List[str]:
+    """SOT columns read by the categorization (mapped SOT field + user type fields)"""
+    _, sot_field = extract_mapping_fields(mapping)
+    columns = [sot_field] if sot_field else []
+    return list(dict.fromkeys(columns + USER_TYPE_FIELDS))
+
+
+def _truthy(values: pd.Series) -> pd.Series:
+    """Truthiness of a text column, missing values count as empty"""
+    return values.notna() & values.fillna("").astype(str).str.len().gt(0)
+
+
+def _normalize(values: pd.Series) -> pd.Series:
+    return values.astype(str).str.strip().str.lower()
+
+
+def build_sot_lookup(sot_df: pd.DataFrame, sot_field: str) -> pd.Series:
+    """
+    Build the key -> status lookup for one SOT.
+    Keys are the lower/stripped sot_field values; for duplicate keys the last row wins.
+    The status is the first non-empty user type field, or "found".
+    """
+    if sot_df.empty or sot_field not in sot_df.columns:
+        return pd.Series(dtype=object)
+
+    sot_df = sot_df[sot_df[sot_field].notna()]
+    type_columns = [field for field in USER_TYPE_FIELDS if field in sot_df.columns]
+    statuses = np.select(
+        [_truthy(sot_df[field]).to_numpy() for field in type_columns],
+        [sot_df[field].to_numpy(dtype=object) for field in type_columns],
+        default="found"
+    ) if type_columns else np.full(len(sot_df), "found", dtype=object)
+
+    lookup = pd.Series(statuses, index=_normalize(sot_df[sot_field]).to_numpy(), dtype=object)
+    return lookup[~lookup.index.duplicated(keep="last")]
+
+
+def build_sot_dict_lookup(sot_rows: List[dict], sot_field: str) -> Dict[str, dict]:
+    """Row-loop engine lookup: lower/stripped sot_field value -> SOT row, for duplicate keys the last row wins"""
+    return {
+        str(row.get(sot_field, "")).strip().lower(): row
+        for row in sot_rows
+        if row.get(sot_field) is not None
+    }
+
+
+def _load_sot_lookup(sot: str, mapping: dict, vectorized: bool):
+    """
+    Fetch one SOT's mapped columns and build its lookup (runs on a load_categorization_inputs worker).
+    A failed fetch or build leaves an empty lookup so the other SOTs still categorize.
+
+    Returns:
+        tuple: (lookup, timing dict)
+    """
+    started = time.perf_counter()
+    _, sot_field = extract_mapping_fields(mapping)
+    try:
+        sot_data = fetch_rows(sot, sot_columns_needed(mapping), row_format="dataframe" if vectorized else "dicts")
+        logging.info(f"Fetched {len(sot_data)} rows from SOT: {sot}")
+    except Exception as e:
+        logging.error(f"Failed to fetch data from SOT '{sot}': {e}")
+        sot_data = pd.DataFrame() if vectorized else []
+    fetched = time.perf_counter()
+
+    empty_lookup = pd.Series(dtype=object) if vectorized else {}
+    if not sot_field:
+        logging.warning(f"No SOT field configured for {sot}")
+        lookup = empty_lookup
+    else:
+        try:
+            lookup = build_sot_lookup(sot_data, sot_field) if vectorized else build_sot_dict_lookup(sot_data, sot_field)
+            logging.info(f"Built lookup for {sot} with {len(lookup)} entries using field '{sot_field}'")
+        except Exception as e:
+            logging.error(f"Error building lookup for {sot}: {e}")
+            lookup = empty_lookup
+    built = time.perf_counter()
+
+    return lookup, {
+        "rows": len(sot_data),
+        "lookup_entries": len(lookup),
+        "fetch_seconds": round(fetched - started, 3),
+        "lookup_seconds": round(built - fetched, 3)
+    }
+
+
+def _load_panel_rows(panel_name: str, columns: List[str], vectorized: bool):
+    started = time.perf_counter()
+    panel_data = fetch_rows(panel_name, columns, row_format="dataframe" if vectorized else "dicts")
+    logging.info(f"Fetched {len(panel_data)} rows from panel: {panel_name}")
+    return panel_data, {"rows": len(panel_data), "fetch_seconds": round(time.perf_counter() - started, 3)}
+
+
+def load_categorization_inputs(
+    panel_name: str,
+    key_mapping: dict,
+    configured_sots: List[str],
+    match_field: str,
+    categorize_engine: str
+):
+    """
+    Fetch the panel and every SOT concurrently and build the SOT lookups on the same workers.
+    Each task reads through its own pooled connection (fetch_rows), so wall time is the slowest
+    table instead of the sum of all tables. At most CATEGORIZE_FETCH_WORKERS tables load at once.
+
+    Args:
+        panel_name: Panel to categorize
+        key_mapping: Panel key_mapping from config_db.json
+        configured_sots: SOTs allowed for categorization
+        match_field: Panel column used to write initial_status back
+        categorize_engine: "python" (list of dicts, dict lookups) or "vectorized" (DataFrame, Series lookups)
+
+    Returns:
+        tuple: (panel rows, SOT name -> lookup, timings)
+
+    Raises:
+        Exception: The panel fetch error (SOT failures only empty that SOT's lookup)
+    """
+    vectorized = categorize_engine == "vectorized"
+    started = time.perf_counter()
+    workers = max(1, min(CATEGORIZE_FETCH_WORKERS, len(configured_sots) + 1))
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="categorize-load") as executor:
+        panel_future = executor.submit(
+            _load_panel_rows, panel_name, panel_columns_needed(key_mapping, configured_sots, match_field), vectorized
+        )
+        sot_futures = {
+            sot: executor.submit(_load_sot_lookup, sot, key_mapping.get(sot, {}), vectorized)
+            for sot in configured_sots
+        }
+        lookups, sot_timings = {}, {}
+        for sot, future in sot_futures.items():
+            lookups[sot], sot_timings[sot] = future.result()
+        panel_data, panel_timing = panel_future.result()
+
+    timings = {
+        "workers": workers,
+        "panel": panel_timing,
+        "sots": sot_timings,
+        "load_seconds": round(time.perf_counter() - started, 3)
+    }
+    logging.info(f"⏱️ Loaded panel '{panel_name}' and {len(configured_sots)} SOTs in {timings['load_seconds']}s with {workers} workers")
+    return panel_data, lookups, timings
+
+
+def categorize_users_vectorized(
+    panel_df: pd.DataFrame,
+    sot_lookups: Dict[str, pd.Series],
+    key_mapping: dict,
+    configured_sots: List[str],
+    match_field: str
+) -> Tuple[Dict[str, int], int, int, List[dict]]:
+    """
+    Column-wise version of the categorize_users row loop.
+    Panel keys are normalized in bulk, domains are split with vectorized string ops and each SOT
+    is probed once for all still-unmatched rows in priority order (service -> internal -> thirdparty).
+
+    Args:
+        panel_df: Panel columns (see panel_columns_needed)
+        sot_lookups: SOT name -> key/status lookup (see build_sot_lookup)
+        key_mapping: Panel key_mapping from config_db.json
+        configured_sots: SOTs allowed for categorization
+        match_field: Panel column used to write initial_status back
+
+    Returns:
+        tuple: (matches per normalized SOT name, not_found count, error count, updates for update_initial_status_bulk)
+    """
+    total = len(panel_df)
+    statuses = pd.Series([None] * total, index=panel_df.index, dtype=object)
+    matched_sot = pd.Series([None] * total, index=panel_df.index, dtype=object)
+
+    for sot in PRIORITY_SOTS:
+        if sot not in configured_sots:
+            continue
+
+        mapping = key_mapping.get(sot, {})
+        panel_field, sot_field = extract_mapping_fields(mapping)
+        if not panel_field or not sot_field or panel_field not in panel_df.columns:
+            continue
+
+        lookup = sot_lookups.get(sot, pd.Series(dtype=object))
+
+        # Only rows with a panel value that no higher-priority SOT has matched yet
+        pending = matched_sot.isna() & _truthy(panel_df[panel_field])
+        if not pending.any() or lookup.empty:
+            continue
+        panel_values = _normalize(panel_df.loc[pending, panel_field])
+
+        use_domain_matching = mapping.get("use_domain_matching", False)
+        is_domain_sot = sot in DOMAIN_SOTS and sot_field == "domain"
+        if use_domain_matching or is_domain_sot:
+            has_at = panel_values.str.contains("@", regex=False)
+            domains = panel_values.str.rsplit("@", n=1).str[-1].str.strip().str.lower()
+            panel_values = panel_values.where(~has_at, domains)
+
+        hits = panel_values.map(lookup)
+        hits = hits[hits.notna()]
+        statuses.loc[hits.index] = hits
+        matched_sot.loc[hits.index] = normalize_sot_name(sot)
+        logging.info(f"Matched {len(hits)} panel rows in {sot}")
+
+    sot_counts = matched_sot.value_counts().to_dict()
+    not_found = int(matched_sot.isna().sum())
+    statuses = statuses.where(matched_sot.notna(), "not found")
+
+    # Rows are written back on the normalized match field, rows without a value count as errors
+    if match_field in panel_df.columns:
+        match_values = panel_df[match_field]
+        has_match_value = match_values.notna()
+        errors = int((~has_match_value).sum())
+        update_frame = pd.DataFrame({
+            match_field: _normalize(match_values[has_match_value]),
+            "initial_status": statuses[has_match_value]
+        })
+    else:
+        errors = 0
+        update_frame = pd.DataFrame({match_field: [""] * total, "initial_status": statuses.to_numpy()})
+    updates = update_frame.to_dict(orient="records")
+
+    return {name: int(count) for name, count in sot_counts.items()}, not_found, errors, updates
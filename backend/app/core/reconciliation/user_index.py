@@ -0,0 +1,41 @@
+import logging
+from typing import Optional, Tuple
+
+from app.core.database.metadata_store import list_recon_summaries
+from app.core.database.mysql_utils import rebuild_user_panel_index, remove_panel_from_user_index
+from app.core.reconciliation.user_summary import latest_recon_by_panel
+from app.utils.file_utils import get_panel_config, panel_key_field
+
+
+def refresh_user_index(panel_name: str, recon_id: Optional[str] = None) -> Tuple[bool, Optional[str]]:
+    """
+    Re-index one panel in user_panel_index after its rows or statuses changed
+    (upload, categorization, reconciliation, recategorization). Other panels are untouched.
+
+    Args:
+        panel_name: Panel name as configured in config_db.json
+        recon_id: Reconciliation to attach; defaults to the panel's latest reconciliation
+
+    Returns:
+        tuple: (success, error_message)
+    """
+    try:
+        panel = get_panel_config(panel_name)
+        if not panel:
+            remove_panel_from_user_index(panel_name)
+            return True, None
+
+        key_field = panel_key_field(panel)
+        if not key_field:
+            logging.warning(f"No key mapping found for panel: {panel_name}, user index not refreshed")
+            return False, f"No key mapping found for panel: {panel_name}"
+
+        if recon_id is None:
+            latest = latest_recon_by_panel(list_recon_summaries(panel_name)).get(panel_name)
+            recon_id = latest.get("recon_id") if latest else None
+
+        rebuild_user_panel_index(panel_name, key_field, recon_id)
+        return True, None
+    except Exception as e:
+        logging.error(f"Failed to refresh user index for panel '{panel_name}': {e}")
+        return False, str(e)
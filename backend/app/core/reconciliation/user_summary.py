@@ -0,0 +1,142 @@
+import base64
+import heapq
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from app.core.database.mysql_utils import fetch_key_ordered_rows, count_key_rows
+from app.utils.file_utils import panel_key_field
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a /users/summary cursor cannot be decoded"""
+
+
+def encode_cursor(email: str, panel_name: str, seen: int) -> str:
+    """
+    Opaque keyset cursor: the last returned email, its panel and how many rows of that panel with
+    an equal email (in the key column collation) have been returned so far.
+    """
+    payload = json.dumps({"e": email, "p": panel_name, "n": seen}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+        return str(payload["e"]), str(payload["p"]), int(payload["n"])
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+
+
+def latest_recon_by_panel(recon_summaries: List[dict]) -> Dict[str, dict]:
+    """Most recent reconciliation (by start_date) for each panel, computed once"""
+    latest = {}
+    for recon in recon_summaries:
+        panel_name = recon.get("panelname", "")
+        if not panel_name:
+            continue
+        current = latest.get(panel_name)
+        if current is None or (recon.get("start_date", "") or "") > (current.get("start_date", "") or ""):
+            latest[panel_name] = recon
+    return latest
+
+
+def _panel_page(panel_name: str, key_field: str, limit: int, cursor, status, email_prefix) -> List[tuple]:
+    """
+    Rows of one panel that come after the cursor, as (sort_key, panel_name, seq, row) merge entries.
+    Rows with a key equal to the cursor email are: all returned already in panels that sort before
+    the cursor panel, none returned in panels after it, and the first `seen` returned in the cursor panel.
+    """
+    if cursor is None:
+        rows = fetch_key_ordered_rows(panel_name, key_field, limit, status=status, key_prefix=email_prefix)
+    else:
+        email, cursor_panel, seen = cursor
+        if panel_name < cursor_panel:
+            rows = fetch_key_ordered_rows(panel_name, key_field, limit, after=email, status=status, key_prefix=email_prefix)
+        elif panel_name > cursor_panel:
+            rows = fetch_key_ordered_rows(panel_name, key_field, limit, after=email, inclusive=True,
+                                          status=status, key_prefix=email_prefix)
+        else:
+            rows = fetch_key_ordered_rows(panel_name, key_field, limit + seen, after=email, inclusive=True,
+                                          status=status, key_prefix=email_prefix)
+            skipped = 0
+            while skipped < seen and skipped < len(rows) and rows[skipped]["at_cursor"]:
+                skipped += 1
+            rows = rows[skipped:]
+    return [(row["sort_key"], panel_name, seq, row) for seq, row in enumerate(rows)]
+
+
+def build_user_summary_page(
+    panels: List[dict],
+    recon_summaries: List[dict],
+    limit: int,
+    cursor: Optional[str] = None,
+    panel_name: Optional[str] = None,
+    status: Optional[str] = None,
+    email_prefix: Optional[str] = None,
+    include_total: bool = False
+) -> dict:
+    """
+    One page of the user-wise summary across panels, ordered by email (key column collation),
+    then panel name. Each panel contributes at most `limit` rows read from its key index; the
+    per-panel pages are merged with heapq.merge on WEIGHT_STRING so the order matches MySQL's.
+
+    Returns:
+        dict: {"users", "count", "next_cursor", "total_users" (only when include_total)}
+    """
+    decoded = decode_cursor(cursor) if cursor else None
+    latest_recons = latest_recon_by_panel(recon_summaries)
+
+    streams = []
+    key_fields = {}
+    for panel in panels:
+        name = panel["name"]
+        if panel_name and name != panel_name:
+            continue
+        key_field = panel_key_field(panel)
+        if not key_field:
+            logging.warning(f"No key mapping found for panel: {name}")
+            continue
+        key_fields[name] = key_field
+        try:
+            streams.append(_panel_page(name, key_field, limit, decoded, status, email_prefix))
+        except Exception as e:
+            logging.error(f"Error processing panel {name}: {e}")
+
+    users = []
+    last = None
+    run = 0  # rows returned so far for the current (email, panel) run, including earlier pages
+    for sort_key, name, _, row in heapq.merge(*streams, key=lambda entry: entry[:3]):
+        if len(users) >= limit:
+            break
+        if last is not None and last[0] == sort_key and last[1] == name:
+            run += 1
+        else:
+            carried = decoded[2] if decoded and name == decoded[1] and row["at_cursor"] else 0
+            run = carried + 1
+        latest = latest_recons.get(name)
+        initial_status = row.get("initial_status") or ""
+        final_status = row.get("final_status") or ""
+        users.append({
+            "email_id": str(row["key"]).strip(),
+            "recon_id": latest.get("recon_id", "") if latest else None,
+            "recon_month": latest.get("recon_month", "") if latest else None,
+            "panel_name": name,
+            "initial_status": initial_status,
+            # If no final_status, use initial_status
+            "final_status": final_status or initial_status
+        })
+        last = (sort_key, name, row)
+
+    next_cursor = None
+    if last is not None and len(users) == limit:
+        next_cursor = encode_cursor(str(last[2]["key"]), last[1], run)
+
+    page = {"users": users, "count": len(users), "next_cursor": next_cursor}
+    if include_total:
+        page["total_users"] = sum(
+            count_key_rows(name, key_field, status=status, key_prefix=email_prefix)
+            for name, key_field in key_fields.items()
+        )
+    return page
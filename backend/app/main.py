@@ -45,13 +45,42 @@ def create_app() -> FastAPI:
     app.include_router(audit_router, prefix="/audit", tags=["Audit"])
     
     # Import and include other routers
-    from app.api.v1 import panels, sot, reconciliation, users, audit
+    from app.api.v1 import panels, sot, reconciliation, users, audit, uploads, debug
     
     app.include_router(panels.router, tags=["Panels"])
     app.include_router(sot.router, tags=["SOT"])
     app.include_router(reconciliation.router, tags=["Reconciliation"])
     app.include_router(users.router, tags=["Users"])
     app.include_router(audit.router, tags=["Audit"])
+    app.include_router(uploads.router, tags=["Uploads"])
+    app.include_router(debug.router, tags=["Debug"])
+    
+    @app.on_event("startup")
+    def init_metadata():
+        # Create the metadata tables and import the legacy JSON history files once
+        from app.core.database.metadata_store import init_metadata_store
+        try:
+            init_metadata_store()
+        except Exception as e:
+            logging.error(f"Failed to initialize metadata store: {e}")
+        # Create panel_status and move status columns of older panel tables into it
+        from app.core.database.mysql_utils import migrate_panel_status_columns
+        try:
+            migrate_panel_status_columns()
+        except Exception as e:
+            logging.error(f"Failed to migrate panel status columns: {e}")
+        # Create the audit table once and start the batched audit writer
+        from app.core.audit.audit_utils import audit_writer
+        audit_writer.start()
+    
+    @app.on_event("shutdown")
+    def shutdown_background_workers():
+        # Cancel queued upload jobs and wait for the running ones
+        from app.core.jobs.job_manager import upload_job_manager
+        upload_job_manager.shutdown(wait=True)
+        # Write the audit events still queued (after the upload jobs have logged theirs)
+        from app.core.audit.audit_utils import audit_writer
+        audit_writer.flush()
     
     return app
 
@@ -0,0 +1,6 @@
+from pydantic import BaseModel
+from typing import List
+
+class DuplicateCheckRequest(BaseModel):
+    upload_type: str = "sot"
+    file_hashes: List[str]
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 class User(BaseModel):
     email: str
@@ -8,4 +8,7 @@ class User(BaseModel):
 
 class Token(BaseModel):
     access_token: str
-    token_type: str 
\ No newline at end of file
+    token_type: str
+
+class UserLookupRequest(BaseModel):
+    emails: List[str] 
\ No newline at end of file
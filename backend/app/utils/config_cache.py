@@ -0,0 +1,84 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class ConfigSnapshot:
+    """
+    Parsed contents of a JSON config file plus the indexes built from it.
+    Snapshots are shared between callers and must be treated as read-only;
+    use load_db / load_sot_config for a private copy to modify and save.
+    """
+
+    def __init__(self, data: Dict[str, Any], signature: Optional[Tuple[int, int, int]], indexes: Dict[str, Any]):
+        self.data = data
+        self.signature = signature
+        self.indexes = indexes
+
+
+class ConfigCache:
+    """
+    Parses a JSON config file once and serves the same snapshot until the file changes.
+    A change is detected from (st_mtime_ns, st_ino, st_size), so edits made outside the
+    process (or an atomic replace of the file) are picked up on the next read.
+    """
+
+    def __init__(self, path: str, default: Callable[[], Dict[str, Any]],
+                 build_indexes: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.path = path
+        self.default = default
+        self.build_indexes = build_indexes
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _signature(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_ino, stat.st_size
+
+    def _build(self, data: Dict[str, Any], signature) -> ConfigSnapshot:
+        indexes = self.build_indexes(data) if self.build_indexes else {}
+        return ConfigSnapshot(data, signature, indexes)
+
+    def get(self) -> ConfigSnapshot:
+        """Current snapshot, re-parsing the file only when its signature changed"""
+        signature = self._signature()
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.signature == signature:
+                self.hits += 1
+                return snapshot
+            self.misses += 1
+            if signature is None:
+                data = self.default()
+            else:
+                try:
+                    with open(self.path, "r") as f:
+                        data = json.load(f)
+                except Exception as e:
+                    # Not cached, so the next read retries (e.g. a half-written file)
+                    logging.error(f"Error loading config {self.path}: {e}")
+                    return self._build(self.default(), None)
+            snapshot = self._build(data, signature)
+            self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self):
+        """Drop the snapshot so the next read re-parses the file (called after writing it)"""
+        with self._lock:
+            self._snapshot = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.path,
+                "hits": self.hits,
+                "misses": self.misses,
+                "cached": self._snapshot is not None
+            }
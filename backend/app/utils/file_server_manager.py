@@ -1,6 +1,8 @@
 import os
 import logging
 import shutil
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -438,6 +440,50 @@ class FileServerManager:
             self.logger.error(f"❌ Stage 1: Error saving uploaded file: {str(e)}")
             raise
     
+    def save_uploaded_file_from_path(self, local_path: str, original_filename: str, upload_type: str, entity_name: str, doc_id: str) -> Dict[str, Any]:
+        """Stage 1: Save an already spooled local file using doc_id as filename, streaming it to the server"""
+        try:
+            self._ensure_initialized()
+            
+            # Ensure directories exist
+            if not self._ensure_directories(upload_type, entity_name):
+                self.logger.error(f"❌ Failed to ensure directories")
+                raise Exception("Failed to create necessary directories")
+            
+            # Generate filename using doc_id + original extension
+            file_extension = Path(original_filename).suffix
+            filename = f"{doc_id}{file_extension}"
+            
+            if self.server_type == "local":
+                file_path = self.get_file_path(upload_type, entity_name, "upload", doc_id, original_filename)
+                shutil.copyfile(local_path, file_path)
+                    
+            elif self.server_type == "ssh":
+                file_path = self.get_file_path(upload_type, entity_name, "upload", doc_id, original_filename)
+                self._sftp_client.put(local_path, file_path)
+                    
+            elif self.server_type == "s3":
+                file_path = f"{upload_type}/{entity_name}/upload/{filename}"
+                self.s3_client.upload_file(local_path, self._bucket_name, file_path)
+            
+            self.logger.info(f"✅ Stage 1: File saved to {upload_type}/{entity_name}/upload: {filename} (doc_id: {doc_id})")
+            
+            return {
+                "doc_id": doc_id,
+                "original_filename": original_filename,
+                "file_path": file_path,
+                "upload_type": upload_type,
+                "entity_name": entity_name,
+                "stage": "upload",
+                "timestamp": datetime.now().isoformat(),
+                "size": os.path.getsize(local_path),
+                "server_type": self.server_type
+            }
+            
+        except Exception as e:
+            self.logger.error(f"❌ Stage 1: Error saving uploaded file: {str(e)}")
+            raise
+    
     def start_processing(self, doc_id: str, original_filename: str, upload_type: str, entity_name: str) -> bool:
         """Stage 2: Move file to processing stage"""
         try:
@@ -535,6 +581,38 @@ class FileServerManager:
             self.logger.error(f"❌ Error reading file content: {str(e)}")
             return None
     
+    @contextmanager
+    def local_copy(self, doc_id: str, original_filename: str, upload_type: str, entity_name: str, stage: str):
+        """
+        Yield a local filesystem path for a file at a given stage so it can be streamed.
+        Local servers yield the file itself; SSH/S3 files are downloaded chunk-wise to a temp file
+        that is removed on exit.
+        """
+        self._ensure_initialized()
+        
+        file_extension = Path(original_filename).suffix
+        filename = f"{doc_id}{file_extension}"
+        
+        if self.server_type == "local":
+            yield self.get_file_path(upload_type, entity_name, stage, doc_id, original_filename)
+            return
+        
+        fd, temp_path = tempfile.mkstemp(prefix="reconify_", suffix=file_extension)
+        os.close(fd)
+        try:
+            if self.server_type == "ssh":
+                file_path = self.get_file_path(upload_type, entity_name, stage, doc_id, original_filename)
+                self._sftp_client.get(file_path, temp_path)
+            elif self.server_type == "s3":
+                file_key = f"{upload_type}/{entity_name}/{stage}/{filename}"
+                self.s3_client.download_file(self._bucket_name, file_key, temp_path)
+            yield temp_path
+        finally:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+    
     def cleanup_failed_upload(self, doc_id: str, original_filename: str, upload_type: str, entity_name: str, stage: str) -> bool:
         """Delete a file from a specified stage in case of failure"""
         try:
@@ -1,76 +1,105 @@
+import copy
 import json
 import os
 import logging
 from typing import Dict, Any
 from .timestamp import get_ist_timestamp
-from app.config.settings import RECON_HISTORY_PATH, CONFIG_DB_PATH, SOT_CONFIG_PATH
+from .config_cache import ConfigCache, ConfigSnapshot
+from app.config.settings import CONFIG_DB_PATH, SOT_CONFIG_PATH
+
+def _index_panels(db: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Panel-by-name, parsed key mappings ({panel: {sot: (panel_field, sot_field)}}) and the
+    status key of each panel table ({sanitized table name: panel field of the first mapping})
+    """
+    panels = db.get("panels", [])
+    return {
+        "panels_by_name": {panel.get("name"): panel for panel in panels},
+        "status_keys": {
+            panel.get("name", "").replace(" ", "_").lower(): panel_key_field(panel)
+            for panel in panels if panel.get("name")
+        },
+        "key_mappings": {
+            panel.get("name"): {
+                sot_name: extract_mapping_fields(mapping)
+                for sot_name, mapping in (panel.get("key_mapping") or {}).items()
+            }
+            for panel in panels
+        }
+    }
+
+def _index_sots(config: Dict[str, Any]) -> Dict[str, Any]:
+    return {"sots_by_name": {sot.get("name"): sot for sot in config.get("sots", [])}}
+
+_db_cache = ConfigCache(CONFIG_DB_PATH, dict, _index_panels)
+_sot_config_cache = ConfigCache(SOT_CONFIG_PATH, lambda: {"sots": []}, _index_sots)
+
+def get_db_snapshot() -> ConfigSnapshot:
+    """Cached, read-only config_db.json snapshot (re-parsed only after the file changes)"""
+    return _db_cache.get()
+
+def get_sot_config_snapshot() -> ConfigSnapshot:
+    """Cached, read-only sot_config.json snapshot (re-parsed only after the file changes)"""
+    return _sot_config_cache.get()
+
+def get_config_cache_stats():
+    return {"config_db": _db_cache.stats(), "sot_config": _sot_config_cache.stats()}
+
+def list_panels():
+    """Configured panels from the cached config (read-only)"""
+    return get_db_snapshot().data.get("panels", [])
+
+def get_panel_config(panel_name):
+    """Panel configuration by name from the cached config (read-only), None if not configured"""
+    return get_db_snapshot().indexes["panels_by_name"].get(panel_name)
+
+def get_panel_key_mappings(panel_name):
+    """Parsed key mappings of a panel: {sot_name: (panel_field, sot_field)}"""
+    return get_db_snapshot().indexes["key_mappings"].get(panel_name, {})
+
+def panel_key_field(panel):
+    """
+    Key column of a panel: the panel field of its first key_mapping entry (the email field), in either
+    mapping format. The one rule for panel_status keys, the user summary and index, delta upload keys
+    and recategorization. None without a usable key mapping.
+    """
+    first_mapping = next(iter((panel.get("key_mapping") or {}).values()), None)
+    return extract_mapping_fields(first_mapping)[0]
+
+def get_panel_status_key(table_name):
+    """
+    Panel column whose normalized value keys the panel's rows in panel_status
+    (see panel_key_field), None if the table is not a configured panel.
+    """
+    return get_db_snapshot().indexes["status_keys"].get(table_name.replace(" ", "_").lower())
 
 def load_db():
-    """Load database from JSON file"""
-    try:
-        if os.path.exists("data/config_db.json"):
-            with open("data/config_db.json", "r") as f:
-                return json.load(f)
-        return {}
-    except Exception as e:
-        print(f"Error loading database: {e}")
-        return {}
+    """Load database from JSON file (a private copy of the cached config, safe to modify and save)"""
+    return copy.deepcopy(get_db_snapshot().data)
 
 def save_db(data: Dict[str, Any]):
     """Save database to JSON file"""
     try:
-        os.makedirs("data", exist_ok=True)
-        with open("data/config_db.json", "w") as f:
+        os.makedirs(os.path.dirname(CONFIG_DB_PATH), exist_ok=True)
+        with open(CONFIG_DB_PATH, "w") as f:
             json.dump(data, f, indent=2)
     except Exception as e:
         print(f"Error saving database: {e}")
-
-def update_upload_history_status(panel_name: str, new_status: str):
-    """
-    Update the status of the most recent upload for a panel in the upload history.
-    """
-    try:
-        if not os.path.exists(RECON_HISTORY_PATH):
-            return False
-        
-        with open(RECON_HISTORY_PATH, "r") as f:
-            panel_history = json.load(f)
-        
-        # Find the most recent upload for this panel and update its status
-        updated = False
-        for entry in reversed(panel_history):
-            if entry.get("panelname") == panel_name:
-                entry["status"] = new_status
-                updated = True
-                break
-        
-        if updated:
-            with open(RECON_HISTORY_PATH, "w") as f:
-                json.dump(panel_history, f, indent=2)
-            logging.info(f"Updated upload history status for panel '{panel_name}' to '{new_status}'")
-            return True
-        
-        return False
-    except Exception as e:
-        logging.error(f"Failed to update upload history status: {e}")
-        return False
+    finally:
+        _db_cache.invalidate()
 
 def load_sot_config():
-    """Load SOT configuration database"""
-    if not os.path.exists(SOT_CONFIG_PATH):
-        return {"sots": []}
-    try:
-        with open(SOT_CONFIG_PATH, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading SOT config: {e}")
-        return {"sots": []}
+    """Load SOT configuration database (a private copy of the cached config, safe to modify and save)"""
+    return copy.deepcopy(get_sot_config_snapshot().data)
 
 def save_sot_config(config):
     """Save SOT configuration database"""
     os.makedirs(os.path.dirname(SOT_CONFIG_PATH), exist_ok=True)
-    with open(SOT_CONFIG_PATH, "w") as f:
-        json.dump(config, f, indent=2)
+    try:
+        with open(SOT_CONFIG_PATH, "w") as f:
+            json.dump(config, f, indent=2)
+    finally:
+        _sot_config_cache.invalidate()
 
 def add_sot_to_config(sot_name, headers, created_by):
     """Add a new SOT to the configuration"""
@@ -104,18 +133,12 @@ def update_sot_headers(sot_name, headers, updated_by):
     return False, "SOT not found"
 
 def get_sot_config(sot_name):
-    """Get SOT configuration by name"""
-    config = load_sot_config()
-    
-    for sot in config["sots"]:
-        if sot["name"] == sot_name:
-            return sot
-    
-    return None
+    """Get SOT configuration by name (read-only, from the cached config)"""
+    return get_sot_config_snapshot().indexes["sots_by_name"].get(sot_name)
 
 def get_all_sot_configs():
-    """Get all SOT configurations"""
-    return load_sot_config()
+    """Get all SOT configurations (read-only, from the cached config)"""
+    return get_sot_config_snapshot().data
 
 def delete_sot_config(sot_name):
     """Delete SOT configuration"""
@@ -123,4 +146,48 @@ def delete_sot_config(sot_name):
     
     config["sots"] = [sot for sot in config["sots"] if sot["name"] != sot_name]
     save_sot_config(config)
-    return True, "SOT deleted successfully"
\ No newline at end of file
+    return True, "SOT deleted successfully"
+
+def extract_mapping_fields(mapping):
+    """Extract panel_field and sot_field from mapping, supporting both old and new formats."""
+    if not mapping:
+        return None, None
+    
+    # Handle new format: {'panel_field': 'panel_field_value', 'sot_field': 'sot_field_value'}
+    if 'panel_field' in mapping and 'sot_field' in mapping:
+        return mapping['panel_field'], mapping['sot_field']
+    
+    # Handle old format: {'panel_field': 'sot_field'}
+    if len(mapping) == 1:
+        panel_field, sot_field = list(mapping.items())[0]
+        return panel_field, sot_field
+    
+    return None, None
+
+def get_key_columns(table_name, db=None):
+    """
+    Get the join key columns of a panel or SOT table from the panels' key_mapping.
+    For a panel table these are the mapped panel fields, for a SOT table the mapped SOT fields.
+    
+    Args:
+        table_name (str): Panel or SOT name (sanitized the same way as the MySQL table name)
+        db (dict): Already loaded config_db.json contents (loaded if not given)
+        
+    Returns:
+        list: Column names in first-seen order
+    """
+    table_name = table_name.replace(" ", "_").lower()
+    if db is None:
+        db = get_db_snapshot().data
+    
+    key_columns = []
+    for panel in db.get("panels", []):
+        is_panel_table = panel.get("name", "").replace(" ", "_").lower() == table_name
+        for sot_name, mapping in (panel.get("key_mapping") or {}).items():
+            panel_field, sot_field = extract_mapping_fields(mapping)
+            if is_panel_table and panel_field:
+                key_columns.append(panel_field)
+            if sot_name.replace(" ", "_").lower() == table_name and sot_field:
+                key_columns.append(sot_field)
+    
+    return list(dict.fromkeys(key_columns))
@@ -0,0 +1,34 @@
+import json
+import logging
+from typing import Iterable, Iterator, List
+
+def iter_json_rows(fields: dict, batches: Iterable[List[dict]], rows_key: str = "rows", label: str = "") -> Iterator[str]:
+    """
+    Encode {**fields, rows_key: [...]} as JSON one batch at a time, so a StreamingResponse
+    can send a table of any size without building the full list in memory.
+
+    Args:
+        fields: Top-level keys written before the rows (e.g. {"panel_name": ...})
+        batches: Iterable of row batches (e.g. mysql_utils.iter_rows)
+        rows_key: Key holding the rows array
+        label: Name used in the completion log line
+    """
+    head = json.dumps(fields, default=str)
+    prefix = head[:-1] + (", " if fields else "") + json.dumps(rows_key) + ": ["
+    yield prefix
+
+    count = 0
+    try:
+        for batch in batches:
+            if not batch:
+                continue
+            chunk = ", ".join(json.dumps(row, default=str) for row in batch)
+            yield (", " if count else "") + chunk
+            count += len(batch)
+    except Exception as e:
+        # Headers are already sent, so the error can only be logged; the client gets truncated JSON
+        logging.error(f"Error streaming rows for '{label}': {e}")
+        raise
+
+    yield "]}"
+    logging.info(f"Streamed {count} rows for '{label}'")
@@ -0,0 +1,111 @@
+import csv
+import codecs
+import hashlib
+import logging
+import os
+import tempfile
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from app.config.settings import UPLOAD_CHUNK_SIZE, INGEST_BATCH_SIZE, UPLOAD_SPOOL_DIR
+
+# Encodings tried (in order) for CSV uploads
+CSV_ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+
+def spool_upload(file_obj, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Tuple[str, str, int]:
+    """
+    Copy an uploaded file to a local spool file chunk by chunk, hashing as it goes.
+
+    Returns:
+        tuple: (spool_path, sha256 hex digest, size in bytes)
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    fd, spool_path = tempfile.mkstemp(prefix="reconify_upload_", dir=UPLOAD_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            while True:
+                chunk = file_obj.read(chunk_size)
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                spool.write(chunk)
+                size += len(chunk)
+    except Exception:
+        remove_spool_file(spool_path)
+        raise
+    return spool_path, sha256.hexdigest(), size
+
+def remove_spool_file(spool_path: Optional[str]):
+    """Delete a spool file, ignoring files that are already gone"""
+    if not spool_path:
+        return
+    try:
+        os.remove(spool_path)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Failed to remove spool file {spool_path}: {e}")
+
+def detect_csv_encoding(path: str, encodings=CSV_ENCODINGS, chunk_size: int = UPLOAD_CHUNK_SIZE) -> Optional[str]:
+    """
+    Return the first encoding that decodes the whole file, reading it chunk by chunk.
+    Returns None if no encoding works.
+    """
+    for encoding in encodings:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        try:
+            with open(path, "rb") as f:
+                while True:
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        decoder.decode(b"", final=True)
+                        break
+                    decoder.decode(chunk)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+def clean_csv_row(row: dict) -> dict:
+    """Lowercase/strip header names and strip values, same as the in-memory CSV path"""
+    return dict((k.strip().lower(), v.strip() if v is not None else "") for k, v in row.items())
+
+def iter_csv_rows(path: str, encoding: str) -> Iterator[dict]:
+    """Yield cleaned CSV rows one at a time without loading the file into memory"""
+    with open(path, "r", encoding=encoding, newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames:
+            reader.fieldnames = [h.strip().lower() for h in reader.fieldnames]
+        for row in reader:
+            yield clean_csv_row(row)
+
+def iter_dataframe_rows(df) -> Iterator[dict]:
+    """Yield DataFrame rows as dicts, converting one batch at a time"""
+    for start in range(0, len(df), INGEST_BATCH_SIZE):
+        for row in df.iloc[start:start + INGEST_BATCH_SIZE].to_dict(orient="records"):
+            yield row
+
+def iter_batches(rows: Iterable[dict], batch_size: int = INGEST_BATCH_SIZE) -> Iterator[List[dict]]:
+    """Group any row iterable into lists of at most batch_size rows"""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            break
+        yield batch
+
+class RowCounter:
+    """Wraps a row iterable and counts the rows that have been consumed"""
+
+    def __init__(self, rows: Iterable[dict]):
+        self._rows = iter(rows)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        row = next(self._rows)
+        self.count += 1
+        return row
@@ -1,11 +1,16 @@
 import logging
 import hashlib
-from app.core.database.mysql_utils import get_panel_headers_from_db
+from app.core.database.mysql_utils import get_panel_headers_from_db, PANEL_STATUS_COLUMNS
 
 def validate_file_structure(sot_name, file_headers):
-    """Validate uploaded file structure against existing table structure"""
+    """
+    Validate uploaded file structure against existing table structure.
+    The status columns added by categorization/reconciliation are not expected in the file.
+    """
     try:
-        existing_headers = get_panel_headers_from_db(sot_name)
+        existing_headers = [
+            header for header in get_panel_headers_from_db(sot_name) if header not in PANEL_STATUS_COLUMNS
+        ]
         if existing_headers:
             missing_columns = set(existing_headers) - set(file_headers)
             extra_columns = set(file_headers) - set(existing_headers)
@@ -31,10 +36,37 @@ def generate_file_hash(file_contents):
         logging.error(f"Error generating file hash: {e}")
         return None
 
+# upload_type -> (history kind, statuses that count as a successful upload)
+DUPLICATE_CHECK_SOURCES = {
+    "sot": ("sot", ["success", "uploaded"]),
+    "panel": ("panel", ["uploaded", "complete"]),
+    # Recategorization files are checked against panel uploads
+    "recategorization": ("panel", ["uploaded", "complete"])
+}
+
+def _duplicate_info(upload, upload_type):
+    """Shape an upload history record as the duplicate_info returned to clients"""
+    if upload_type == "sot":
+        return {
+            "upload_type": "SOT",
+            "file_name": upload.get("doc_name"),
+            "uploaded_by": upload.get("uploaded_by"),
+            "timestamp": upload.get("timestamp"),
+            "sot_type": upload.get("sot_type")
+        }
+    return {
+        "upload_type": "Panel" if upload_type == "panel" else "Recategorization",
+        "file_name": upload.get("docname"),
+        "uploaded_by": upload.get("uploadedby"),
+        "timestamp": upload.get("timestamp"),
+        "panel_name": upload.get("panelname")
+    }
+
 def check_duplicate_file(file_hash, file_name, upload_type="sot"):
     """
     Check if a file with the same hash has been successfully uploaded before.
     Only considers successful uploads, ignoring failed uploads.
+    Answered from the (kind, file_hash, status) index of the upload history.
     
     Args:
         file_hash (str): SHA-256 hash of file contents
@@ -45,77 +77,40 @@ def check_duplicate_file(file_hash, file_name, upload_type="sot"):
         tuple: (is_duplicate, duplicate_info)
     """
     try:
-        if not file_hash:
+        if not file_hash or upload_type not in DUPLICATE_CHECK_SOURCES:
             return False, None
-            
-        if upload_type == "sot":
-            # Check SOT uploads from the correct file
-            from app.config.settings import SOT_UPLOADS_PATH
-            import json
-            import os
-            
-            if os.path.exists(SOT_UPLOADS_PATH):
-                with open(SOT_UPLOADS_PATH, "r") as f:
-                    sot_uploads = json.load(f)
-                
-                for upload in sot_uploads:
-                    # Only consider successful uploads
-                    if (upload.get("file_hash") == file_hash and 
-                        upload.get("status") in ["success", "uploaded"]):
-                        return True, {
-                            "upload_type": "SOT",
-                            "file_name": upload.get("doc_name"),
-                            "uploaded_by": upload.get("uploaded_by"),
-                            "timestamp": upload.get("timestamp"),
-                            "sot_type": upload.get("sot_type")
-                        }
         
-        elif upload_type == "panel":
-            # Check panel uploads
-            from app.config.settings import RECON_HISTORY_PATH
-            import json
-            import os
-            
-            if os.path.exists(RECON_HISTORY_PATH):
-                with open(RECON_HISTORY_PATH, "r") as f:
-                    panel_history = json.load(f)
-                
-                for upload in panel_history:
-                    # Only consider successful uploads
-                    if (upload.get("file_hash") == file_hash and 
-                        upload.get("status") in ["uploaded", "complete"]):
-                        return True, {
-                            "upload_type": "Panel",
-                            "file_name": upload.get("docname"),
-                            "uploaded_by": upload.get("uploadedby"),
-                            "timestamp": upload.get("timestamp"),
-                            "panel_name": upload.get("panelname")
-                        }
-        
-        elif upload_type == "recategorization":
-            # Check panel uploads for recategorization files
-            from app.config.settings import RECON_HISTORY_PATH
-            import json
-            import os
-            
-            if os.path.exists(RECON_HISTORY_PATH):
-                with open(RECON_HISTORY_PATH, "r") as f:
-                    panel_history = json.load(f)
-                
-                for upload in panel_history:
-                    # Only consider successful uploads
-                    if (upload.get("file_hash") == file_hash and 
-                        upload.get("status") in ["uploaded", "complete"]):
-                        return True, {
-                            "upload_type": "Recategorization",
-                            "file_name": upload.get("docname"),
-                            "uploaded_by": upload.get("uploadedby"),
-                            "timestamp": upload.get("timestamp"),
-                            "panel_name": upload.get("panelname")
-                        }
+        from app.core.database.metadata_store import find_upload_by_hash
         
+        kind, statuses = DUPLICATE_CHECK_SOURCES[upload_type]
+        upload = find_upload_by_hash(kind, file_hash, statuses)
+        if upload:
+            return True, _duplicate_info(upload, upload_type)
         return False, None
         
     except Exception as e:
         logging.error(f"Error checking duplicate file: {e}")
-        return False, None 
\ No newline at end of file
+        return False, None
+
+def check_duplicate_files(file_hashes, upload_type="sot"):
+    """
+    Bulk check_duplicate_file for many hashes at once (e.g. a folder pre-validated by a client).
+    
+    Args:
+        file_hashes (list): SHA-256 hashes
+        upload_type (str): Type of upload ("sot", "panel", "recategorization")
+    
+    Returns:
+        dict: file_hash -> (is_duplicate, duplicate_info)
+    """
+    if upload_type not in DUPLICATE_CHECK_SOURCES:
+        raise ValueError(f"Unknown upload_type '{upload_type}'. Use one of {list(DUPLICATE_CHECK_SOURCES)}")
+    
+    from app.core.database.metadata_store import find_uploads_by_hashes
+    
+    kind, statuses = DUPLICATE_CHECK_SOURCES[upload_type]
+    found = find_uploads_by_hashes(kind, file_hashes, statuses)
+    return {
+        file_hash: (True, _duplicate_info(found[file_hash], upload_type)) if file_hash in found else (False, None)
+        for file_hash in file_hashes
+    }
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Test script for AuditWriter: events that MySQL rejects go to the JSON-lines spool file
+and are replayed in order once inserts succeed again; flush() drains the queue on shutdown.
+Runs without MySQL: the writer's _insert is replaced with an in-memory fake.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.audit.audit_writer import AuditWriter
+
+
+class FakeAuditTable:
+    """Stands in for audit_trail; fail_after=n accepts n more batches, then rejects until reset"""
+
+    def __init__(self):
+        self.rows = []
+        self.batches = 0
+        self.fail_after = None
+
+    def insert(self, rows):
+        if self.fail_after is not None:
+            if self.fail_after <= 0:
+                raise ConnectionError("MySQL is down")
+            self.fail_after -= 1
+        self.batches += 1
+        self.rows.extend(rows)
+
+
+def _make_writer(tmp, batch_size=2, max_queue=100, flush_interval=0.05):
+    table = FakeAuditTable()
+    writer = AuditWriter(max_queue, batch_size, flush_interval, os.path.join(tmp, "audit", "spool.jsonl"))
+    writer._insert = table.insert
+    return writer, table
+
+
+def _event(n):
+    return {"timestamp": f"01-01-2026 00:00:{n:02d}", "action": f"ACTION_{n}", "user_name": "tester",
+            "details": "{}", "status": "success", "ip_address": None, "user_agent": None,
+            "created_at": "2026-01-01T00:00:00"}
+
+
+def _spooled_actions(writer):
+    with open(writer._spool_path) as f:
+        return [json.loads(line)["action"] for line in f if line.strip()]
+
+
+def test_failed_batch_is_spooled():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, table = _make_writer(tmp)
+        table.fail_after = 0
+
+        assert writer._write([_event(1), _event(2)]) is False
+        assert table.rows == []
+        assert _spooled_actions(writer) == ["ACTION_1", "ACTION_2"]
+        stats = writer.get_stats()
+        assert stats["spooled"] == 2 and stats["failed_batches"] == 1 and stats["spool_file"] is True
+
+
+def test_replay_after_recovery():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, table = _make_writer(tmp)
+        table.fail_after = 0
+        writer._write([_event(1), _event(2)])
+        writer._write([_event(3)])
+
+        # Still down: nothing is lost and the spool keeps its order
+        writer._replay_spool()
+        assert _spooled_actions(writer) == ["ACTION_1", "ACTION_2", "ACTION_3"]
+        assert writer.get_stats()["replayed"] == 0
+
+        table.fail_after = None
+        writer._replay_spool()
+        assert [row["action"] for row in table.rows] == ["ACTION_1", "ACTION_2", "ACTION_3"]
+        assert table.batches == 2
+        assert not os.path.exists(writer._spool_path)
+        assert not os.path.exists(writer._spool_path + ".replay")
+        stats = writer.get_stats()
+        assert stats["replayed"] == 3 and stats["spooled"] == 3 and stats["spool_file"] is False
+
+
+def test_partial_replay_keeps_remainder():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, table = _make_writer(tmp, batch_size=2)
+        table.fail_after = 0
+        writer._write([_event(n) for n in range(1, 6)])
+
+        # The first replay batch goes through, the second fails
+        table.fail_after = 1
+        writer._replay_spool()
+        assert [row["action"] for row in table.rows] == ["ACTION_1", "ACTION_2"]
+        assert _spooled_actions(writer) == ["ACTION_3", "ACTION_4", "ACTION_5"]
+        assert writer.get_stats()["replayed"] == 2
+        # Re-spooled rows were already counted when first spooled
+        assert writer.get_stats()["spooled"] == 5
+
+        table.fail_after = None
+        writer._replay_spool()
+        assert [row["action"] for row in table.rows] == [f"ACTION_{n}" for n in range(1, 6)]
+        assert not os.path.exists(writer._spool_path)
+        assert writer.get_stats()["replayed"] == 5
+
+
+def test_full_queue_spools():
+    with tempfile.TemporaryDirectory() as tmp:
+        writer, table = _make_writer(tmp, max_queue=1)
+        # Pretend the writer thread is running but stalled so the queue fills up
+        writer._thread = object()
+
+        assert writer.enqueue(_event(1)) is True
+        assert writer.enqueue(_event(2)) is False
+        assert _spooled_actions(writer) == ["ACTION_2"]
+        stats = writer.get_stats()
+        assert stats["queued"] == 1 and stats["spooled"] == 1 and stats["pending"] == 1
+
+
+def test_flush_drains_queue():
+    with tempfile.TemporaryDirectory() as tmp:
+        # A long flush interval and a large batch: only flush() makes these rows go out
+        writer, table = _make_writer(tmp, batch_size=100, flush_interval=30)
+        for n in range(1, 6):
+            assert writer.enqueue(_event(n)) is True
+
+        writer.flush(timeout=5)
+        assert [row["action"] for row in table.rows] == [f"ACTION_{n}" for n in range(1, 6)]
+        stats = writer.get_stats()
+        assert stats["written"] == 5 and stats["pending"] == 0
+
+        # Once stopped, events are written directly
+        assert writer.enqueue(_event(6)) is True
+        assert table.rows[-1]["action"] == "ACTION_6"
+
+
+if __name__ == "__main__":
+    test_failed_batch_is_spooled()
+    test_replay_after_recovery()
+    test_partial_replay_keeps_remainder()
+    test_full_queue_spools()
+    test_flush_drains_queue()
+    print("✅ Audit writer tests passed")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for the /categorize_users engines: the python row loop and the vectorized
+(pandas) engine must produce the same summary and the same initial_status updates.
+Runs without MySQL: the panel and SOT tables are served from memory.
+"""
+
+import os
+import sys
+from unittest import mock
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.v1 import users
+from app.core.reconciliation import categorization
+
+PANEL_NAME = "Test Panel"
+
+PANEL_CONFIG = {
+    "name": PANEL_NAME,
+    "key_mapping": {
+        "service_users": {"email": "email"},
+        "internal_users": {"panel_field": "email", "sot_field": "domain"},
+        "thirdparty_users": {"email": "domain"},
+        "hr_data": {"email": "email"}  # not a categorization SOT, ignored
+    }
+}
+
+TABLES = {
+    "test_panel": [
+        {"email": "svc.bot@corp.com", "name": "service account"},
+        {"email": "  SVC.Bot2@Corp.com ", "name": "service account, mixed case"},
+        {"email": "alice@corp.com", "name": "internal by domain"},
+        {"email": "bob@CORP.com", "name": "internal by domain, mixed case"},
+        {"email": "vendor@partner.io", "name": "third party by domain"},
+        {"email": "nobody@unknown.org", "name": "not found"},
+        {"email": "", "name": "empty key, not found"},
+        {"email": None, "name": "no key, counted as error"},
+        {"email": "svc.typed@corp.com", "name": "service account with a user type"},
+    ],
+    "service_users": [
+        {"email": "svc.bot@corp.com", "user_type": None},
+        {"email": "svc.bot2@corp.com", "user_type": ""},
+        {"email": "svc.typed@corp.com", "user_type": "service"},
+        # Duplicate key: the last row wins in both engines
+        {"email": "SVC.TYPED@corp.com", "user_type": "service_user"},
+        {"email": None, "user_type": "ignored"},
+    ],
+    "internal_users": [
+        {"domain": "corp.com", "category": "employee"},
+    ],
+    "thirdparty_users": [
+        {"domain": "partner.io", "type": "", "status": "thirdparty"},
+    ],
+}
+
+
+def fake_fetch_rows(table_name, columns=None, where=None, row_format="dicts"):
+    """In-memory fetch_rows: projects the requested columns the table has, like the real one"""
+    rows = TABLES.get(table_name.replace(" ", "_").lower(), [])
+    existing = list(rows[0].keys()) if rows else []
+    selected = existing if columns is None else [col for col in dict.fromkeys(columns) if col in existing]
+    projected = [{col: row.get(col) for col in selected} for row in rows]
+    if row_format == "dataframe":
+        return pd.DataFrame(projected, columns=selected)
+    return projected
+
+
+def run_engine(engine):
+    """Run categorize_users with the given engine and capture the status updates it writes"""
+    written = {}
+
+    def fake_update(panel_name, updates, match_field="email", recon_id=None):
+        written["updates"] = updates
+        written["match_field"] = match_field
+        return True, None
+
+    with mock.patch.object(categorization, "fetch_rows", fake_fetch_rows), \
+            mock.patch.object(users, "get_panel_config", lambda name: PANEL_CONFIG if name == PANEL_NAME else None), \
+            mock.patch.object(users, "update_initial_status_bulk", fake_update), \
+            mock.patch.object(users, "refresh_user_index", lambda *args, **kwargs: (True, None)), \
+            mock.patch.object(users, "log_audit_event", lambda *args, **kwargs: None):
+        response = users.categorize_users(panel_name=PANEL_NAME, engine=engine)
+    return response, written
+
+
+def _sorted_updates(updates):
+    return sorted((update["email"], str(update["initial_status"])) for update in updates)
+
+
+def test_engines_agree():
+    """Both engines report the same summary and write the same statuses"""
+    python_response, python_written = run_engine("python")
+    vectorized_response, vectorized_written = run_engine("vectorized")
+
+    assert python_response["summary"] == vectorized_response["summary"]
+    assert python_response["successful_updates"] == vectorized_response["successful_updates"]
+    assert python_written["match_field"] == vectorized_written["match_field"] == "email"
+    assert _sorted_updates(python_written["updates"]) == _sorted_updates(vectorized_written["updates"])
+
+
+def test_expected_categories():
+    """Priority, domain matching, user type fields and duplicate keys resolve as documented"""
+    response, written = run_engine("vectorized")
+    summary = response["summary"]
+    assert summary == {
+        "service_users": 3,
+        "internal_users": 2,
+        "thirdparty_users": 1,
+        "not_found": 3,
+        "total": 9,
+        "errors": 1
+    }
+
+    statuses = dict(_sorted_updates(written["updates"]))
+    assert statuses["svc.bot@corp.com"] == "found"
+    assert statuses["svc.bot2@corp.com"] == "found"
+    assert statuses["svc.typed@corp.com"] == "service_user"
+    assert statuses["alice@corp.com"] == "employee"
+    assert statuses["bob@corp.com"] == "employee"
+    assert statuses["vendor@partner.io"] == "thirdparty"
+    assert statuses["nobody@unknown.org"] == "not found"
+    assert statuses[""] == "not found"
+
+
+def test_timings_reported():
+    """Each SOT and the panel report their row counts and load times"""
+    response, _ = run_engine("python")
+    timings = response["timings"]
+    assert set(timings["sots"]) == {"service_users", "internal_users", "thirdparty_users"}
+    assert timings["panel"]["rows"] == len(TABLES["test_panel"])
+    assert timings["sots"]["service_users"]["rows"] == len(TABLES["service_users"])
+    assert timings["sots"]["service_users"]["lookup_entries"] == 3
+
+
+if __name__ == "__main__":
+    test_engines_agree()
+    test_expected_categories()
+    test_timings_reported()
+    print("✅ Categorization engine tests passed")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test script for ConfigCache: the parsed snapshot is reused until the file's
+(mtime, inode, size) signature changes, and failed parses are never cached.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.config_cache import ConfigCache
+
+
+def _write(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def _make_cache(path):
+    return ConfigCache(path, lambda: {"panels": []},
+                       lambda data: {"names": {panel["name"] for panel in data.get("panels", [])}})
+
+
+def test_hit_on_unchanged_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "db.json")
+        _write(path, {"panels": [{"name": "alpha"}]})
+        cache = _make_cache(path)
+
+        first = cache.get()
+        second = cache.get()
+        assert first is second
+        assert first.data == {"panels": [{"name": "alpha"}]}
+        assert first.indexes["names"] == {"alpha"}
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_reparse_on_mtime_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "db.json")
+        _write(path, {"panels": [{"name": "alpha"}]})
+        cache = _make_cache(path)
+        first = cache.get()
+
+        # Same size, only the mtime moves
+        _write(path, {"panels": [{"name": "gamma"}]})
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, first.signature[0] + 1_000_000_000))
+
+        second = cache.get()
+        assert second is not first
+        assert second.indexes["names"] == {"gamma"}
+
+
+def test_reparse_on_size_change_with_same_mtime():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "db.json")
+        _write(path, {"panels": [{"name": "alpha"}]})
+        cache = _make_cache(path)
+        first = cache.get()
+
+        # An edit within the filesystem's mtime granularity: mtime restored, size differs
+        _write(path, {"panels": [{"name": "alpha"}, {"name": "beta"}]})
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, first.signature[0]))
+        assert os.stat(path).st_mtime_ns == first.signature[0]
+
+        second = cache.get()
+        assert second is not first
+        assert second.indexes["names"] == {"alpha", "beta"}
+
+
+def test_reparse_on_inode_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "db.json")
+        _write(path, {"panels": [{"name": "alpha"}]})
+        cache = _make_cache(path)
+        first = cache.get()
+
+        # Atomic replace with identical size and mtime; holding the old file open keeps its inode from being reused
+        with open(path) as old_file:
+            replacement = os.path.join(tmp, "db.json.tmp")
+            _write(replacement, {"panels": [{"name": "omega"}]})
+            os.utime(replacement, ns=(first.signature[0], first.signature[0]))
+            os.replace(replacement, path)
+            stat = os.stat(path)
+            assert stat.st_ino != first.signature[1]
+            assert (stat.st_mtime_ns, stat.st_size) == (first.signature[0], first.signature[2])
+
+            second = cache.get()
+            old_file.close()
+        assert second is not first
+        assert second.indexes["names"] == {"omega"}
+
+
+def test_missing_file_returns_default():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = _make_cache(os.path.join(tmp, "missing.json"))
+        snapshot = cache.get()
+        assert snapshot.data == {"panels": []}
+        assert snapshot.signature is None
+        assert snapshot.indexes["names"] == set()
+
+
+def test_invalid_json_is_not_cached():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "db.json")
+        with open(path, "w") as f:
+            f.write('{"panels": [')
+        cache = _make_cache(path)
+
+        broken = cache.get()
+        assert broken.data == {"panels": []}
+        assert cache.stats()["cached"] is False
+
+        # Completing the write is picked up even if the signature did not move
+        _write(path, {"panels": [{"name": "alpha"}]})
+        assert cache.get().indexes["names"] == {"alpha"}
+        assert cache.stats()["cached"] is True
+
+
+def test_invalidate():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "db.json")
+        _write(path, {"panels": [{"name": "alpha"}]})
+        cache = _make_cache(path)
+        first = cache.get()
+
+        cache.invalidate()
+        assert cache.stats()["cached"] is False
+        second = cache.get()
+        assert second is not first
+        assert second.data == first.data
+        assert cache.stats()["misses"] == 2
+
+
+if __name__ == "__main__":
+    test_hit_on_unchanged_file()
+    test_reparse_on_mtime_change()
+    test_reparse_on_size_change_with_same_mtime()
+    test_reparse_on_inode_change()
+    test_missing_file_returns_default()
+    test_invalid_json_is_not_cached()
+    test_invalidate()
+    print("✅ Config cache tests passed")
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for the /recon/process engines: the python matching loop and the SQL pushdown
+must produce the same summary and write the same initial_status values, including for keys
+with stray tabs, CR/LF and spaces (str.strip() vs the SQL stripping).
+Needs the configured MySQL database; works on scratch tables and skips when MySQL is unreachable.
+"""
+
+import functools
+import os
+import sys
+from unittest import mock
+
+import pytest
+from sqlalchemy import text
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.v1 import reconciliation
+from app.core.database import mysql_utils
+from app.core.database.engine import engine
+
+PANEL_NAME = "Recon Parity Panel"
+PANEL_TABLE = "recon_parity_panel"
+HR_TABLE = "recon_parity_hr"
+
+PANEL_CONFIG = {"name": PANEL_NAME, "key_mapping": {"hr_data": {"email": "email"}}}
+
+# (email, initial_status set before reconciling)
+PANEL_ROWS = [
+    ("alice@corp.com", "internal"),
+    ("bob@corp.com", "employee"),
+    ("carol@corp.com", "not found"),
+    ("dave@corp.com", "internal_user"),
+    ("erin@corp.com", "internal"),
+    ("frank@corp.com", "not_found"),
+    ("svc@corp.com", "service"),
+    ("vendor@partner.io", "thirdparty"),
+    # Stored with a tab/CR: no status can be keyed to it, so both engines leave it alone
+    ("\tgrace@corp.com\r", "internal"),
+]
+
+HR_ROWS = [
+    {"email": "alice@corp.com", "Employment Status": "Active"},
+    {"email": "\tBob@Corp.com\r\n", "Employment Status": "Inactive"},
+    {"email": "carol@corp.com ", "Employment Status": "Resigned"},
+    {"email": " dave@corp.com", "Employment Status": "On Leave"},
+    {"email": "erin@corp.com\t", "Employment Status": ""},
+    {"email": "grace@corp.com", "Employment Status": "Active"},
+]
+
+
+def mysql_available():
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
+def drop_scratch_tables():
+    mysql_utils.clear_panel_status(PANEL_TABLE)
+    with engine.begin() as conn:
+        for table_name in (PANEL_TABLE, HR_TABLE):
+            conn.execute(text(f"DROP TABLE IF EXISTS `{table_name}`"))
+    for table_name in (PANEL_TABLE, HR_TABLE):
+        mysql_utils.invalidate_table_schema(table_name)
+
+
+def create_scratch_tables():
+    drop_scratch_tables()
+    mysql_utils.create_panel_table(PANEL_NAME, ["email", "name"], ["email"])
+    mysql_utils.insert_panel_data_rows(PANEL_NAME, [{"email": email, "name": status} for email, status in PANEL_ROWS])
+    mysql_utils.create_sot_table(HR_TABLE, ["email", "Employment Status"], ["email"])
+    mysql_utils.insert_sot_data_rows(HR_TABLE, HR_ROWS)
+
+
+def read_statuses():
+    with engine.connect() as conn:
+        rows = conn.execute(
+            text(f"SELECT user_key, initial_status FROM `{mysql_utils.PANEL_STATUS_TABLE}` WHERE panel = :panel"),
+            {"panel": PANEL_TABLE}
+        ).fetchall()
+    return {row.user_key: row.initial_status for row in rows}
+
+
+def run_engine(engine_name):
+    """Seed the categorization statuses, reconcile with the given engine, return (summary, statuses)"""
+    mysql_utils.clear_panel_status(PANEL_TABLE)
+    mysql_utils.update_initial_status_bulk(
+        PANEL_TABLE, [{"email": email, "initial_status": status} for email, status in PANEL_ROWS], match_field="email"
+    )
+
+    # /recon/process always reads hr_data; point it at the scratch HR table
+    scratch_name = lambda table_name: HR_TABLE if table_name == "hr_data" else table_name
+    real_iter_rows, real_table_has_rows = mysql_utils.iter_rows, mysql_utils.table_has_rows
+    with mock.patch.object(mysql_utils, "get_panel_status_key", lambda table_name: "email" if table_name == PANEL_TABLE else None), \
+            mock.patch.object(reconciliation, "get_panel_config", lambda name: PANEL_CONFIG if name == PANEL_NAME else None), \
+            mock.patch.object(reconciliation, "iter_rows", lambda table_name, *args, **kwargs: real_iter_rows(scratch_name(table_name), *args, **kwargs)), \
+            mock.patch.object(reconciliation, "table_has_rows", lambda table_name: real_table_has_rows(scratch_name(table_name))), \
+            mock.patch.object(reconciliation, "reconcile_hr_status_pushdown", functools.partial(mysql_utils.reconcile_hr_status_pushdown, hr_table=HR_TABLE)), \
+            mock.patch.object(reconciliation, "get_current_user", lambda request: "tester"), \
+            mock.patch.object(reconciliation, "append_recon_summary", lambda record: None), \
+            mock.patch.object(reconciliation, "update_upload_history_status", lambda *args, **kwargs: None), \
+            mock.patch.object(reconciliation, "refresh_user_index", lambda *args, **kwargs: (True, None)), \
+            mock.patch.object(reconciliation, "log_audit_event", lambda *args, **kwargs: None):
+        response = reconciliation.reconcile_panel_with_sot(request=None, panel_name=PANEL_NAME, engine=engine_name)
+        statuses = read_statuses()
+    return response["summary"], statuses
+
+
+@pytest.fixture(scope="module", autouse=True)
+def scratch_tables():
+    if not mysql_available():
+        pytest.skip("MySQL is not reachable")
+    create_scratch_tables()
+    yield
+    drop_scratch_tables()
+
+
+def test_engines_agree():
+    """Both engines report the same summary and leave the same statuses"""
+    python_summary, python_statuses = run_engine("python")
+    sql_summary, sql_statuses = run_engine("sql")
+    assert python_summary == sql_summary
+    assert python_statuses == sql_statuses
+
+
+def test_expected_statuses():
+    """Whitespace around HR and panel keys is stripped like str.strip(), employment statuses map as documented"""
+    summary, statuses = run_engine("sql")
+    assert {field: summary[field] for field in ("total_panel_users", "internal_users", "not_found_users", "other_users",
+                                                "service_users", "thirdparty_users", "matched", "found_active",
+                                                "found_inactive", "not_found")} == {
+        "total_panel_users": 9,
+        "internal_users": 4,
+        "not_found_users": 2,
+        "other_users": 3,
+        "service_users": 1,
+        "thirdparty_users": 1,
+        "matched": 5,
+        "found_active": 2,
+        "found_inactive": 1,
+        "not_found": 1
+    }
+    assert statuses == {
+        "alice@corp.com": "active",
+        "bob@corp.com": "inactive",
+        "carol@corp.com": "active",
+        "dave@corp.com": "found (on leave)",
+        "erin@corp.com": "found (unknown status)",
+        "frank@corp.com": "not found",
+        "svc@corp.com": "service",
+        "vendor@partner.io": "thirdparty"
+    }
+
+
+if __name__ == "__main__":
+    if not mysql_available():
+        print("⏭️ MySQL is not reachable, recon engine tests skipped")
+        sys.exit(0)
+    create_scratch_tables()
+    try:
+        test_engines_agree()
+        test_expected_statuses()
+    finally:
+        drop_scratch_tables()
+    print("✅ Recon engine tests passed")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Test script for the keyset-paginated /users/summary (build_user_summary_page).
+Walking every page with next_cursor must return each panel row exactly once, in
+(email, panel) order, for any page size, including emails repeated within and across panels.
+Runs without MySQL: fetch_key_ordered_rows / count_key_rows are served from memory.
+"""
+
+import os
+import sys
+from unittest import mock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.reconciliation import user_summary
+from app.core.reconciliation.user_summary import build_user_summary_page, decode_cursor, InvalidCursorError
+
+PANELS = [
+    {"name": "beta", "key_mapping": {"service_users": {"email": "email"}}},
+    {"name": "alpha", "key_mapping": {"service_users": {"panel_field": "mail", "sot_field": "email"}}},
+    {"name": "gamma", "key_mapping": {"service_users": {"email": "email"}}},
+    {"name": "no_mapping", "key_mapping": {}},
+]
+
+# Panel rows as (key, initial_status, final_status); keys compare case-insensitively like the column collation
+TABLES = {
+    "beta": [
+        ("a@x.com", "internal", None), ("B@x.com", "service", None), ("b@x.com", "internal", "active"),
+        ("b@x.com", "not found", None), ("c@x.com", "internal", None), ("", "internal", None),
+        ("zed@x.com", "thirdparty", None),
+    ],
+    "alpha": [
+        ("b@x.com", "service", None), ("b@x.com", "internal", None), ("d@x.com", "internal", "inactive"),
+        (None, "internal", None),
+    ],
+    "gamma": [
+        ("a@x.com", "internal", None), ("b@x.com", "internal", None), ("e@x.com", "service", None),
+        ("B@X.COM", "thirdparty", None),
+    ],
+}
+KEY_FIELDS = {"beta": "email", "alpha": "mail", "gamma": "email"}
+
+
+def _ordered_rows(table_name, status=None, key_prefix=None):
+    """Rows the key index would return: non-empty keys in collation order (ties keep table order)"""
+    rows = []
+    for key, initial_status, final_status in TABLES.get(table_name, []):
+        if not key:
+            continue
+        if status is not None and (final_status or initial_status) != status:
+            continue
+        if key_prefix and not key.lower().startswith(key_prefix.lower()):
+            continue
+        rows.append({"key": key, "sort_key": key.lower().encode(), "initial_status": initial_status,
+                     "final_status": final_status})
+    return sorted(rows, key=lambda row: row["sort_key"])
+
+
+def fake_fetch_key_ordered_rows(table_name, key_field, limit, after=None, inclusive=False, status=None, key_prefix=None):
+    assert key_field == KEY_FIELDS[table_name]
+    page = []
+    for row in _ordered_rows(table_name, status, key_prefix):
+        if after is not None:
+            after_key = after.lower().encode()
+            if row["sort_key"] < after_key or (row["sort_key"] == after_key and not inclusive):
+                continue
+        page.append({**row, "at_cursor": after is not None and row["sort_key"] == after.lower().encode()})
+        if len(page) >= limit:
+            break
+    return page
+
+
+def fake_count_key_rows(table_name, key_field, status=None, key_prefix=None):
+    return len(_ordered_rows(table_name, status, key_prefix))
+
+
+def walk_pages(limit, **filters):
+    """Follow next_cursor until the last page; returns every returned user and the page count"""
+    users, pages, cursor = [], 0, None
+    with mock.patch.object(user_summary, "fetch_key_ordered_rows", fake_fetch_key_ordered_rows), \
+            mock.patch.object(user_summary, "count_key_rows", fake_count_key_rows):
+        while True:
+            page = build_user_summary_page(PANELS, [], limit, cursor=cursor, **filters)
+            pages += 1
+            assert page["count"] == len(page["users"]) <= limit
+            users.extend(page["users"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return users, pages
+            assert pages < 100, "pagination does not terminate"
+
+
+def expected_users(status=None, key_prefix=None, panel_name=None):
+    rows = []
+    for name in sorted(TABLES):
+        if panel_name and name != panel_name:
+            continue
+        for row in _ordered_rows(name, status, key_prefix):
+            rows.append((row["sort_key"], name, row["key"].strip(), row["initial_status"]))
+    # Stable sort keeps each panel's own order for equal keys
+    return [(name, key, initial_status) for _, name, key, initial_status in sorted(rows, key=lambda entry: entry[:2])]
+
+
+def _summarize(users):
+    return [(user["panel_name"], user["email_id"], user["initial_status"]) for user in users]
+
+
+def test_every_page_size_returns_each_row_once():
+    """Duplicates within a panel and across panels are neither skipped nor repeated across page boundaries"""
+    expected = expected_users()
+    for limit in range(1, len(expected) + 2):
+        users, _ = walk_pages(limit)
+        assert _summarize(users) == expected, f"limit={limit}"
+
+
+def test_filters_and_single_panel():
+    """Status, email prefix and panel filters page the same way"""
+    for limit in (1, 2, 3):
+        users, _ = walk_pages(limit, status="internal")
+        assert _summarize(users) == expected_users(status="internal")
+        users, _ = walk_pages(limit, email_prefix="B")
+        assert _summarize(users) == expected_users(key_prefix="B")
+        users, _ = walk_pages(limit, panel_name="alpha")
+        assert _summarize(users) == expected_users(panel_name="alpha")
+
+
+def test_final_status_falls_back_to_initial_status():
+    users, _ = walk_pages(50)
+    by_email = {(user["panel_name"], user["email_id"], user["initial_status"]): user for user in users}
+    assert by_email[("beta", "b@x.com", "internal")]["final_status"] == "active"
+    assert by_email[("beta", "b@x.com", "not found")]["final_status"] == "not found"
+
+
+def test_total_and_cursor_contents():
+    with mock.patch.object(user_summary, "fetch_key_ordered_rows", fake_fetch_key_ordered_rows), \
+            mock.patch.object(user_summary, "count_key_rows", fake_count_key_rows):
+        page = build_user_summary_page(PANELS, [], 3, include_total=True)
+    assert page["total_users"] == len(expected_users())
+    email, panel_name, seen = decode_cursor(page["next_cursor"])
+    assert (panel_name, email.lower()) == (page["users"][-1]["panel_name"], page["users"][-1]["email_id"].lower())
+    assert seen >= 1
+
+
+def test_invalid_cursor():
+    try:
+        build_user_summary_page(PANELS, [], 10, cursor="not-a-cursor")
+    except InvalidCursorError:
+        return
+    raise AssertionError("an undecodable cursor must raise InvalidCursorError")
+
+
+if __name__ == "__main__":
+    test_every_page_size_returns_each_row_once()
+    test_filters_and_single_panel()
+    test_final_status_falls_back_to_initial_status()
+    test_total_and_cursor_contents()
+    test_invalid_cursor()
+    print("✅ User summary cursor tests passed")
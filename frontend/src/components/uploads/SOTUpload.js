@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from "react";
-import { API_BASE, getSOTList, getSOTUploads, uploadSOTFile } from "../../utils/api";
+import { API_BASE, getSOTList, getSOTUploads, uploadSOTFile, waitForUploadJob } from "../../utils/api";
 import { MAX_FILE_SIZE } from '../../utils/constants';
 
 export default function SOTUpload() {
@@ -171,7 +171,12 @@ export default function SOTUpload() {
         body: formData
       });
       
-      const uploadData = await uploadRes.json();
+      let uploadData = await uploadRes.json();
+      
+      // Upload runs as a background job; wait for the table to be loaded
+      if (!uploadData.error && uploadData.job_status) {
+        uploadData = await waitForUploadJob(uploadData.doc_id, uploadData);
+      }
       
       if (uploadData.error) {
         setError(uploadData.error);
@@ -184,9 +184,16 @@ export async function recategorizeUsers(panelName, file) {
   return res.json();
 }
 
-// Get user-wise summary across all panels
-export async function getUserWiseSummary() {
-  const res = await fetch(`${API_BASE}/users/summary`, {
+// Get one keyset page of the user-wise summary (params: limit, cursor, panel_name, status, email_prefix, include_total)
+export async function getUserWiseSummaryPage(params = {}) {
+  const query = new URLSearchParams();
+  Object.entries(params).forEach(([key, value]) => {
+    if (value !== undefined && value !== null && value !== "") {
+      query.append(key, value);
+    }
+  });
+  const queryString = query.toString();
+  const res = await fetch(`${API_BASE}/users/summary${queryString ? `?${queryString}` : ""}`, {
     headers: createAuthHeaders(),
   });
   if (!res.ok) {
@@ -195,6 +202,40 @@ export async function getUserWiseSummary() {
   return res.json();
 }
 
+// Get user-wise summary across all panels (follows next_cursor until the last page)
+export async function getUserWiseSummary(params = {}) {
+  const users = [];
+  let cursor = null;
+  do {
+    const page = await getUserWiseSummaryPage({ ...params, cursor });
+    users.push(...(page.users || []));
+    cursor = page.next_cursor;
+  } while (cursor);
+  return { total_users: users.length, users };
+}
+
+// Get background upload job status
+export async function getUploadJob(docId) {
+  const res = await fetch(`${API_BASE}/uploads/jobs/${docId}`, {
+    headers: createAuthHeaders(),
+  });
+  if (!res.ok) {
+    throw new Error(`Failed to fetch upload job: ${res.statusText}`);
+  }
+  return res.json();
+}
+
+// Poll an upload job until it finishes and return its final upload result
+export async function waitForUploadJob(docId, accepted, intervalMs = 2000) {
+  for (;;) {
+    const job = await getUploadJob(docId);
+    if (job.status === "completed" || job.status === "failed") {
+      return job.result || { ...accepted, status: "failed", error: job.error || "Upload failed" };
+    }
+    await new Promise(resolve => setTimeout(resolve, intervalMs));
+  }
+}
+
 // Upload SOT file
 export async function uploadSOTFile(file, sotType) {
   const formData = new FormData();
@@ -205,7 +246,9 @@ export async function uploadSOTFile(file, sotType) {
     headers: createAuthHeaders(),
     body: formData,
   });
-  return res.json();
+  const accepted = await res.json();
+  if (accepted.error || !accepted.job_status) return accepted;
+  return waitForUploadJob(accepted.doc_id, accepted);
 }
 
 // Upload panel file
@@ -218,7 +261,9 @@ export async function uploadPanelData(panelName, file) {
     headers: createAuthHeaders(),
     body: formData,
   });
-  return res.json();
+  const accepted = await res.json();
+  if (accepted.error || !accepted.job_status) return accepted;
+  return waitForUploadJob(accepted.docid, accepted);
 }
 
 // Get SOT uploads list